@@ -15,7 +15,6 @@ import numpy as np
 import pandas as pd
 
 from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_samples
 
 DATA_FOLDER = "data/zenodo"
 
@@ -33,22 +32,13 @@ def get_k_means_hourly_demand(n_days: int, load_prof_yr: list) -> tuple[np.ndarr
             - Matrix of size (n_days, 24) with the combined hourly demand of all representative days
     """
     k_means_model = KMeans(n_clusters=n_days, random_state=0).fit(load_prof_yr)  # Deterministic clustering
-    cluster_labels = k_means_model.fit_predict(load_prof_yr)
+    cluster_labels = k_means_model.labels_
     hourly_dem = k_means_model.cluster_centers_
 
     if n_days > 1:
-        # The silhouette_score gives the average value for all the samples.
-        # This gives a perspective into the density and separation of the formed clusters
-        sample_silhouette_values = silhouette_samples(load_prof_yr, cluster_labels)
-        size_cluster = np.zeros(n_days)
-        for i in range(n_days):
-            # get the number of days corresponding to each cluster
-            size_cluster[i] = len(sample_silhouette_values[cluster_labels == i])
-
-        cluster_ratios = np.zeros(n_days)
-        for i in range(n_days):
-            # calculate the % of representation of cluster i in the whole year
-            cluster_ratios[i] = size_cluster[i] / sum(size_cluster)
+        # % of representation of each cluster in the whole year (number of days with that shape)
+        size_cluster = np.bincount(cluster_labels, minlength=n_days)
+        cluster_ratios = size_cluster / size_cluster.sum()
     else:
         # ratio is 100% if only one day was requested
         cluster_ratios = [1]
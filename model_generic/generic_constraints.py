@@ -307,7 +307,7 @@ def cost_investment(model: pyo.ConcreteModel, entity_list, years):
     cost = 0
     for e in entity_list:
         if DATA.check_cnf(e, "enable_capacity"):
-            cost += sum(model.DISC[y] * DATA.get(e, "cost_investment", y) * model.cnew[e, y] for y in years)
+            cost += sum(model.DISCRATE[y] * DATA.get(e, "cost_investment", y) * model.cnew[e, y] for y in years)
     return cost
 
 
@@ -317,7 +317,7 @@ def cost_fixed_om(model: pyo.ConcreteModel, entity_list, years):
     for e in entity_list:
         if DATA.check_cnf(e, "enable_capacity"):
             cost += sum(
-                model.DISC[y] * DATA.get(e, "cost_fixed_om_annual", y) * model.ctot[e, y] for y in years
+                model.DISCRATE[y] * DATA.get(e, "cost_fixed_om_annual", y) * model.ctot[e, y] for y in years
             )
     return cost
 
@@ -325,7 +325,7 @@ def cost_fixed_om(model: pyo.ConcreteModel, entity_list, years):
 def cost_variable_om(model: pyo.ConcreteModel, entity_list, years):
     """Get variable O&M cost for a set of entity_list."""
     cost = sum(
-        model.DISC[y] * DATA.get(e, "cost_variable_om", y) * sum(model.a[e, y, h] for h in model.H)
+        model.DISCRATE[y] * DATA.get(e, "cost_variable_om", y) * sum(model.a[e, y, h] for h in model.H)
         for e in entity_list
         for y in years
     )
@@ -25,12 +25,12 @@ from model_utils.configuration import DATA
 # --------------------------------------------------------------------------- #
 def e_total_annual_inflow(model: pyo.ConcreteModel, f: str, e: str, y: int):
     """Total of a specific inflow/input of an entity, for each year."""
-    return sum(model.DL[y, d] * sum(model.HL * model.fin[f, e, y, d, h] for h in model.H) for d in model.D)
+    return sum(model.DL[y, d] * sum(model.HL * model.fin[f, e, y, d, h] for h in model._h_tuple) for d in model._d_tuple)
 
 
 def e_total_annual_outflow(model: pyo.ConcreteModel, f: str, e: str, y: int):
     """Total of a specific outflow/output of an entity, for each year."""
-    return sum(model.DL[y, d] * sum(model.HL * model.fout[f, e, y, d, h] for h in model.H) for d in model.D)
+    return sum(model.DL[y, d] * sum(model.HL * model.fout[f, e, y, d, h] for h in model._h_tuple) for d in model._d_tuple)
 
 
 # --------------------------------------------------------------------------- #
@@ -43,9 +43,16 @@ def e_hourly_capacity_to_activity(_, e: str, y: int):
     return pyo.Expression.Skip
 
 
+def e_hourly_capacity_to_activity_with_HL(model: pyo.ConcreteModel, e: str, y: int):
+    """Variant of e_hourly_capacity_to_activity scaled by the hour-slice length."""
+    if DATA.check_cnf(e, "enable_capacity"):
+        return model.HL * e_hourly_capacity_to_activity(model, e, y)
+    return pyo.Expression.Skip
+
+
 def e_total_annual_activity(model: pyo.ConcreteModel, e: str, y: int):
     """Return the total annual activity of an entity in a year."""
-    return sum(model.DL[y, d] * sum(model.HL * model.a[e, y, d, h] for h in model.H) for d in model.D)
+    return sum(model.DL[y, d] * sum(model.HL * model.a[e, y, d, h] for h in model._h_tuple) for d in model._d_tuple)
 
 
 # --------------------------------------------------------------------------- #
@@ -55,7 +62,7 @@ def e_cost_investment(model: pyo.ConcreteModel, e: str):
     """Return the total investment cost of an entity. Assumes investments occur at the start of a year slice."""
     if e not in model.Caps:
         return 0
-    return sum(model.DISC[y] * DATA.get(e, "cost_investment", y) * model.cnew[e, y] for y in model.Y)
+    return sum(model.DISCRATE[y] * DATA.get(e, "cost_investment", y) * model.cnew[e, y] for y in model._y_tuple)
 
 
 def e_cost_fixed_om(model: pyo.ConcreteModel, e: str):
@@ -63,26 +70,15 @@ def e_cost_fixed_om(model: pyo.ConcreteModel, e: str):
     if e not in model.Caps:
         return 0
     # For non-modelled years: assume total capacity remains the same as the last modelled year
-    cost_fixed_om = sum(
-        model.DISC[y + i] * DATA.get(e, "cost_fixed_om_annual", y) * model.ctot[e, y]
-        for y in model.Y if y != model.Y.last()
-        for i in range(model.YL())
-    )
-    # Add the cost of the last year
-    y = model.Y.last()
-    cost_fixed_om += model.DISC[y] * DATA.get(e, "cost_fixed_om_annual", y) * model.ctot[e, y]
-    return cost_fixed_om
+    # DISCCUM already sums the discount rates over each year-slice, so one term per year suffices
+    return sum(model.DISCCUM[y] * DATA.get(e, "cost_fixed_om_annual", y) * model.ctot[e, y] for y in model._y_tuple)
 
 
 def e_cost_variable_om(model: pyo.ConcreteModel, e: str):
     """Return the total variable cost of an entity."""
     # For non-modelled years: assume activity remains the same as the last modelled year
-    cost_var_om = sum(
-        model.DISC[y + i] * DATA.get(e, "cost_variable_om", y) * model.e_TotalAnnualActivity[e, y]
-        for y in model.Y if y != model.Y.last()
-        for i in range(model.YL())
+    # DISCCUM already sums the discount rates over each year-slice, so one term per year suffices
+    return sum(
+        model.DISCCUM[y] * DATA.get(e, "cost_variable_om", y) * model.e_TotalAnnualActivity[e, y]
+        for y in model._y_tuple
     )
-    # Add the cost of the last year
-    y_last = model.Y.last()
-    cost_var_om += model.DISC[y_last] * DATA.get(e, "cost_variable_om", y_last) * model.e_TotalAnnualActivity[e, y_last]
-    return cost_var_om
@@ -12,6 +12,7 @@
 Although 'sector' is a bit of a misnomer, this module is meant to keep the demand-building
 functions separate from the rest of the code.
 """
+import numpy as np
 import pyomo.environ as pyo
 
 from model_utils import configuration as cnf
@@ -20,6 +21,39 @@ from gen_utils import k_clustering
 
 GROUP_ID = "dem_"
 
+# Passenger travel demand shape, taken from the STEM model.
+# TODO: temporary until a standard file for load shapes is created
+PASS_DEMAND_SHAPE = np.array(
+    [
+        0,
+        0,
+        0,
+        0.001672241,
+        0.003344482,
+        0.013377926,
+        0.050167224,
+        0.066889632,
+        0.050167224,
+        0.046822742,
+        0.046822742,
+        0.063545151,
+        0.060200669,
+        0.070234114,
+        0.056856187,
+        0.060200669,
+        0.08361204,
+        0.093645485,
+        0.075250836,
+        0.058528428,
+        0.033444816,
+        0.026755853,
+        0.025083612,
+        0.013377926,
+    ],
+    dtype=np.float64,
+)
+PASS_DEMAND_SHAPE.setflags(write=False)  # Shared read-only constant
+
 
 # --------------------------------------------------------------------------- #
 # Module-specific expressions
@@ -32,58 +66,46 @@ def _e_cost_total(model: pyo.ConcreteModel):
 # --------------------------------------------------------------------------- #
 # Module-specific constraints
 # --------------------------------------------------------------------------- #
+def _fix_bulk(var, values: dict):
+    """Fix a block of variable cells from an {index: value} map in one pass.
+
+    Values must be pre-validated floats: writes go straight into the indexed-variable
+    storage, skipping the per-call component lookup and domain checks of .fix().
+    """
+    var_store = var._data
+    for index, value in values.items():
+        var_data = var_store[index]
+        var_data.fixed = True
+        var_data._value = value
+
+
 def _init_dem_elec(model: pyo.ConcreteModel):
     """Electricity demand is taken using K-Means, for now."""
     # Set electricity demand
     elec_demand_y = {y: cnf.DATA.get_annual("dem_elec", "actual_demand", y) for y in model.Y}
     ratio, elec_demand_y_h = k_clustering.get_demand_shape(cnf.ISO3, model.Y, cnf.NDAYS, elec_demand_y)
-    # Reshape into year, day, hour
-    elec_demand_y_h = {key: value for key, value in elec_demand_y_h.items()}
 
+    values = {}  # type: dict[tuple, float]
     for y in model.Y:
+        demand_d_h = elec_demand_y_h[y]
         for d in model.D:
             model.DL[y, d].value = ratio[y][d]*365
             for h in model.H:
-                model.a["dem_elec", y, d, h].fix(elec_demand_y_h[y][d][h])
+                values["dem_elec", y, d, h] = float(demand_d_h[d][h])
+    _fix_bulk(model.a, values)
 
 
 def _init_dem_passenger(model: pyo.ConcreteModel):
     """Passenger demand uses the demand shape from the STEM model, for now."""
-    # Set passenger travel demand
-    # TODO: temporary until a standard file for load shapes is created
-    pass_demand_shape = [
-        0,
-        0,
-        0,
-        0.001672241,
-        0.003344482,
-        0.013377926,
-        0.050167224,
-        0.066889632,
-        0.050167224,
-        0.046822742,
-        0.046822742,
-        0.063545151,
-        0.060200669,
-        0.070234114,
-        0.056856187,
-        0.060200669,
-        0.08361204,
-        0.093645485,
-        0.075250836,
-        0.058528428,
-        0.033444816,
-        0.026755853,
-        0.025083612,
-        0.013377926,
-    ]
-
+    # Set passenger travel demand: one annual lookup and one vectorized scaling per year
+    values = {}  # type: dict[tuple, float]
     for y in model.Y:
         dem_y = cnf.DATA.get_annual("dem_passenger", "actual_demand", y)
+        hourly_dem = PASS_DEMAND_SHAPE * (dem_y / 365)
         for d in model.D:
             for h in model.H:
-                hourly_dem = pass_demand_shape[h] * dem_y / 365
-                model.a["dem_passenger", y, d, h].fix(hourly_dem)
+                values["dem_passenger", y, d, h] = float(hourly_dem[h])
+    _fix_bulk(model.a, values)
 
 
 # --------------------------------------------------------------------------- #
@@ -91,12 +113,12 @@ def _init_dem_passenger(model: pyo.ConcreteModel):
 # --------------------------------------------------------------------------- #
 def _sets(model: pyo.ConcreteModel):
     """Create sets used by this sector."""
-    demands = set(cnf.ENTITIES[cnf.ENTITIES.str.startswith(GROUP_ID)])
+    demands = cnf.DATA.entities_with_prefix(GROUP_ID)
     model.Dems = pyo.Set(initialize=demands, ordered=False)
     model.DemsFiE = pyo.Set(
         within=model.F * model.E,
         ordered=False,
-        initialize={(f, e) for f, e in model.FiE if e in demands},
+        initialize={(f, e) for f, e in model._fie_tuple if e in demands},
     )
 
 
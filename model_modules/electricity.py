@@ -8,6 +8,7 @@
 # https://www.apache.org/licenses/LICENSE-2.0
 # --------------------------------------------------------------------------- #
 """Electricity sector, based in D-EXPANSE functionality."""
+import numpy as np
 import pyomo.environ as pyo
 
 from model_utils import configuration as cnf
@@ -20,6 +21,15 @@ OUTFLOW_ID = "elecsupply"
 VRE_NAMES = ["onshorewind", "pv", "offshorewind"]
 VRE_DICT = data_handler.get_lf_vre(cnf.ISO2)
 
+# Contiguous (entity, year, hour-of-day) view of the VRE load factors, so the hourly
+# constraint rules index a float array with plain integers instead of nested dicts
+VRE_IDX = {e: i for i, e in enumerate(sorted(VRE_DICT))}
+VRE_Y0 = min(y for y, _ in next(iter(VRE_DICT.values())))
+VRE_LF = np.zeros((len(VRE_IDX), max(y for y, _ in next(iter(VRE_DICT.values()))) - VRE_Y0 + 1, 24))
+for _e, _i in VRE_IDX.items():
+    for (_y, _h), _lf in VRE_DICT[_e].items():
+        VRE_LF[_i, _y - VRE_Y0, _h] = _lf
+
 
 # --------------------------------------------------------------------------- #
 # Module-specific expressions
@@ -37,13 +47,41 @@ def _c_act_cf_max_hour(model: pyo.ConcreteModel, e: str, y: int, d: int, h: int)
 
     Accounts for VRE load factors.
     """
-    if not cnf.DATA.check_cnf(e, "enable_capacity"):
-        return pyo.Constraint.Skip
-    if e in model.ElecsVRE:
-        lf_max = VRE_DICT[e][y, h % 24]
-    else:
-        lf_max = cnf.DATA.get(e, "lf_max", y)
-    return model.a[e, y, d, h] <= lf_max * model.ctot[e, y] * model.e_HourlyC2A[e, y]
+    # Declared over ElecsCaps, so enable_capacity is guaranteed by the index set.
+    # The VRE branch, config lookups and the hourly capacity-to-activity factor are
+    # pre-resolved per (entity, year) in _sets.
+    coef = model._elec_cf_max_coef[e, y][h % 24]
+    return model.a[e, y, d, h] <= coef * model.ctot[e, y]
+
+
+def _capacity_foe_pairs(model: pyo.ConcreteModel) -> tuple[tuple, tuple]:
+    """Return the outflow (flow, entity) pairs used by the peak/base capacity rules.
+
+    Built lazily (model.Trades must exist) and cached, together with the per-year float
+    coefficients of each pair, so the rules assemble pure coefficient-times-ctot sums
+    without redoing the set algebra or configuration lookups per year.
+    """
+    if not hasattr(model, "_elec_foe_caps"):
+        caps_no_trades = frozenset(model.Caps) - frozenset(model.Trades)
+        caps_and_trades = frozenset(model.Caps) & frozenset(model.Trades)
+        model._elec_foe_caps = tuple((f, e) for f, e in model._foe_tuple if f == OUTFLOW_ID and e in caps_no_trades)
+        model._elec_foe_trades = tuple((f, e) for f, e in model._foe_tuple if f == OUTFLOW_ID and e in caps_and_trades)
+        model._elec_peak_coef = {
+            (e, y): cnf.DATA.get_fxe(e, "output_efficiency", f, y) * cnf.DATA.get(e, "peak_ratio", y)
+            for f, e in model._elec_foe_caps
+            for y in cnf.YEARS
+        }
+        model._elec_base_coef = {
+            (e, y): cnf.DATA.get_fxe(e, "output_efficiency", f, y) * cnf.DATA.get(e, "lf_min", y)
+            for f, e in model._elec_foe_caps
+            for y in cnf.YEARS
+        }
+        model._elec_export_coef = {
+            (e, y): cnf.DATA.get_fxe(e, "input_efficiency", f, y)
+            for f, e in model._elec_foe_trades
+            for y in cnf.YEARS
+        }
+    return model._elec_foe_caps, model._elec_foe_trades
 
 
 # TODO: needs to be more robust... will break if several countries are present.
@@ -54,33 +92,22 @@ def _c_cap_peak(model: pyo.ConcreteModel, y: int):
     if cap_margin is None:
         raise ValueError("Peak capacity margin must be configured for", f)
     peak_power = cnf.DATA.get_annual(f, "peak_capacity_demand", y)
-    pk_cap_sys = sum(
-            model.ctot[e, y] * cnf.DATA.get_fxe(e, "output_efficiency", fx, y) * cnf.DATA.get(e, "peak_ratio", y)
-            for fx, e in model.FoE
-            if fx == f and e in (model.Caps - model.Trades)
-    )
+    foe_caps, _ = _capacity_foe_pairs(model)
+    pk_cap_sys = pyo.quicksum(model._elec_peak_coef[e, y] * model.ctot[e, y] for _, e in foe_caps)
     return pk_cap_sys >= (1 + cap_margin) * peak_power
 
 
 def _c_cap_base(model, y):
     """Meet base capacity requirement, including imports."""
     f = OUTFLOW_ID
-    base_power = cnf.DATA.get_annual(f, "base_capacity_demand", y)
-    base_cap_sys = sum(
-        model.ctot[e, y] * cnf.DATA.get_fxe(e, "output_efficiency", fx, y) * cnf.DATA.get(e, "lf_min", y)
-        for fx, e in model.FoE
-        if fx == f and e in (model.Caps - model.Trades)
-    )
-    export_capacity = sum(
-        model.ctot[e, y] * cnf.DATA.get_fxe(e, "input_efficiency", fx, y)
-        for fx, e in model.FoE
-        if fx == f and e in (model.Trades & model.Caps)
-    )
-    if isinstance(base_cap_sys, int):
-        print(f"Warning: Skipped base capacity requirement of {base_cap_sys} for {y}. Check LF data.")
+    foe_caps, foe_trades = _capacity_foe_pairs(model)
+    if not foe_caps:  # No capacity-enabled generators connected: nothing to constrain
+        print(f"Warning: Skipped base capacity requirement for {y}. Check LF data.")
         return pyo.Constraint.Skip
-    constraint = base_power >= base_cap_sys - export_capacity
-    return constraint  # System must be able to go lower than the lowest expected demand
+    base_power = cnf.DATA.get_annual(f, "base_capacity_demand", y)
+    base_cap_sys = pyo.quicksum(model._elec_base_coef[e, y] * model.ctot[e, y] for _, e in foe_caps)
+    export_capacity = pyo.quicksum(model._elec_export_coef[e, y] * model.ctot[e, y] for _, e in foe_trades)
+    return base_power >= base_cap_sys - export_capacity  # System must be able to go lower than the lowest expected demand
 
 
 # --------------------------------------------------------------------------- #
@@ -88,25 +115,41 @@ def _c_cap_base(model, y):
 # --------------------------------------------------------------------------- #
 def _sets(model: pyo.ConcreteModel):
     """Create sets used by this sector."""
-    elec_entities = set()  # type: set[str]
-    for group in GROUP_IDS:
-        elec_entities = elec_entities | set(cnf.ENTITIES[cnf.ENTITIES.str.startswith(group)])
+    elec_entities = frozenset().union(*(cnf.DATA.entities_with_prefix(group) for group in GROUP_IDS))
     model.Elecs = pyo.Set(initialize=elec_entities, ordered=False)
 
     vre_entities = set(c for c in elec_entities for vre in VRE_NAMES if vre in c)
     model.ElecsVRE = pyo.Set(initialize=vre_entities, ordered=False)
 
+    # Capacity-enabled subset: hourly constraints are declared over this set so Pyomo
+    # never invokes their rules just to return Constraint.Skip
+    elec_caps = cnf.DATA.build_cnf_set(elec_entities, "enable_capacity")
+    model.ElecsCaps = pyo.Set(initialize=elec_caps, ordered=False)
+
     model.ElecsFoE = pyo.Set(
         within=model.F * model.E,
         ordered=False,
-        initialize={(f, e) for f, e in model.FoE if e in elec_entities},
+        initialize={(f, e) for f, e in model._foe_tuple if e in elec_entities},
     )
     model.ElecsFiE = pyo.Set(
         within=model.F * model.E,
         ordered=False,
-        initialize={(f, e) for f, e in model.FiE if e in elec_entities},
+        initialize={(f, e) for f, e in model._fie_tuple if e in elec_entities},
     )
 
+    # Per-(entity, year) hourly capacity coefficients: the load-factor vector over the
+    # 24 hours of a day (a VRE_LF row for renewables, broadcast lf_max otherwise),
+    # pre-multiplied by the hourly capacity-to-activity factor. The max-CF rule is then
+    # a single dict hit plus an array index per model cell.
+    model._elec_cf_max_coef = {}
+    for e in elec_caps:
+        for y in cnf.YEARS:
+            hourly_c2a = cnf.DATA.get(e, "capacity_to_activity", y) / (365 * 24)
+            if e in vre_entities:
+                model._elec_cf_max_coef[e, y] = VRE_LF[VRE_IDX[e], y - VRE_Y0] * hourly_c2a
+            else:
+                model._elec_cf_max_coef[e, y] = np.full(24, cnf.DATA.get(e, "lf_max", y) * hourly_c2a)
+
 
 def _expressions(model: pyo.ConcreteModel):
     model.elec_e_CostTotal = pyo.Expression(expr=_e_cost_total(model))
@@ -127,18 +170,18 @@ def _constraints(model: pyo.ConcreteModel):
     model.elec_c_cap_buildrate = pyo.Constraint(model.Elecs, model.Y, rule=gen_con.c_cap_buildrate)
     # Activity
     model.elec_c_act_ramp_up = pyo.Constraint(
-        model.Elecs, model.Y, model.D, model.H - model.H0, rule=gen_con.c_act_ramp_up
+        model.ElecsCaps, model.Y, model.D, model.HnoH0, rule=gen_con.c_act_ramp_up
     )
     model.elec_c_act_ramp_down = pyo.Constraint(
-        model.Elecs, model.Y, model.D, model.H - model.H0, rule=gen_con.c_act_ramp_down
+        model.ElecsCaps, model.Y, model.D, model.HnoH0, rule=gen_con.c_act_ramp_down
     )
     model.elec_c_act_max_annual = pyo.Constraint(model.Elecs, model.Y, rule=gen_con.c_act_max_annual)
     model.elec_c_act_cf_min_hour = pyo.Constraint(
-        model.Elecs, model.Y, model.D, model.H, rule=gen_con.c_act_cf_min_hour
+        model.ElecsCaps, model.Y, model.D, model.H, rule=gen_con.c_act_cf_min_hour
     )
 
     # Sector specific
-    model.elec_c_act_cf_max_hour = pyo.Constraint(model.Elecs, model.Y, model.D, model.H, rule=_c_act_cf_max_hour)
+    model.elec_c_act_cf_max_hour = pyo.Constraint(model.ElecsCaps, model.Y, model.D, model.H, rule=_c_act_cf_max_hour)
     # Peak and base-load capacity requirements
     model.elec_c_cap_peak = pyo.Constraint(model.Y, rule=_c_cap_peak)
     model.elec_c_cap_base = pyo.Constraint(model.Y, rule=_c_cap_base)
@@ -29,12 +29,12 @@ def _e_cost_total(model: pyo.ConcreteModel):
 # --------------------------------------------------------------------------- #
 def _sets(model: pyo.ConcreteModel):
     """Create sets used by this sector."""
-    extractions = set(cnf.ENTITIES[cnf.ENTITIES.str.startswith(GROUP_ID)])
+    extractions = cnf.DATA.entities_with_prefix(GROUP_ID)
     model.Extrs = pyo.Set(initialize=extractions, ordered=False)
     model.ExtrsFoE = pyo.Set(
         within=model.F * model.E,
         ordered=False,
-        initialize={(f, e) for f, e in model.FoE if e in extractions},
+        initialize={(f, e) for f, e in model._foe_tuple if e in extractions},
     )
 
 
@@ -52,10 +52,10 @@ def _constraints(model: pyo.ConcreteModel):
     model.ext_c_cap_buildrate = pyo.Constraint(model.Extrs, model.Y, rule=gen_con.c_cap_buildrate)
     # Activity
     model.ext_c_act_ramp_up = pyo.Constraint(
-        model.Extrs, model.Y, model.D, model.H - model.H0, rule=gen_con.c_act_ramp_up
+        model.Extrs, model.Y, model.D, model.HnoH0, rule=gen_con.c_act_ramp_up
     )
     model.ext_c_act_ramp_down = pyo.Constraint(
-        model.Extrs, model.Y, model.D, model.H - model.H0, rule=gen_con.c_act_ramp_down
+        model.Extrs, model.Y, model.D, model.HnoH0, rule=gen_con.c_act_ramp_down
     )
     model.ext_c_act_max_annual = pyo.Constraint(model.Extrs, model.Y, rule=gen_con.c_act_max_annual)
     model.ext_c_act_cf_min_hour = pyo.Constraint(
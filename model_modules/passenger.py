@@ -32,25 +32,28 @@ def _c_travel_time_budget(model: pyo.ConcreteModel, y):
     population = cnf.DATA.get_annual("country", "actual_population", y)
     daily_time = cnf.DATA.get_annual("country", "daily_travel_time", y)
     travel_time_budget = population * daily_time * 365
-    time_travelled = 1e6 * sum(
-        model.e_TotalAnnualOutflow[f, e, y] / cnf.DATA.get_fxe(e, "speed", f, y) for f, e in model.PassTransFoE
+    # Pre-resolved coefficients: one speed lookup per (flow, entity, year), done before
+    # the expression is assembled instead of inside it
+    inv_speed = {(f, e): 1e6 / cnf.DATA.get_fxe(e, "speed", f, y) for f, e in model.PassTransFoE}
+    time_travelled = pyo.quicksum(
+        inv_speed[f, e] * model.e_TotalAnnualOutflow[f, e, y] for f, e in model.PassTransFoE
     )
     return travel_time_budget >= time_travelled
 
 
 def _sets(model: pyo.ConcreteModel):
     """Create sets used by this sector."""
-    techs = set(cnf.ENTITIES[cnf.ENTITIES.str.startswith(GROUP_ID)])
+    techs = cnf.DATA.entities_with_prefix(GROUP_ID)
     model.PassTrans = pyo.Set(initialize=techs, ordered=False)
     model.PassTransFoE = pyo.Set(
         within=model.F * model.E,
         ordered=False,
-        initialize={(f, e) for f, e in model.FoE if e in techs},
+        initialize={(f, e) for f, e in model._foe_tuple if e in techs},
     )
     model.PassTransFiE = pyo.Set(
         within=model.F * model.E,
         ordered=False,
-        initialize={(f, e) for f, e in model.FiE if e in techs},
+        initialize={(f, e) for f, e in model._fie_tuple if e in techs},
     )
 
 
@@ -13,7 +13,9 @@ To reduce model complexity, the module re-purposes standard model variables as m
 For clarity:
 - fin equates to the storage uptake/charge/inflow
 - fout equates to the storage dispatch/discharge/outflow
-- a equates to the storage state-of-charge
+- a equates to the storage activity (charge + discharge)
+- soc, the state-of-charge, is a closed-form expression of the flows (the hourly
+  recursion, unrolled)
 
 # NOTE: no SoC operational range constraints, for now (i.e., full charge and empty states possible).
 # NOTE: constraints assume capacity is ALWAYS enabled (deactivation does not make sense for this module)
@@ -24,6 +26,8 @@ https://pypsa.readthedocs.io/en/latest/optimal_power_flow.html#storage-unit-cons
 An option to use Kotzur's seasonal storage method will be added in the future.
 https://doi.org/10.1016/j.apenergy.2018.01.023
 """
+from functools import lru_cache
+
 import pyomo.environ as pyo
 
 from model_utils import configuration as cnf
@@ -31,6 +35,11 @@ from model_generic import generic_constraints as gen_con
 
 GROUP_ID = "sto_"
 
+# Hour grid as plain ints, with each hour's position: the closed-form SoC expression
+# weighs flows by how many slices separate them from the evaluated hour
+HOURS_LIST = cnf.HOURS.tolist()
+HOUR_POS = {h: k for k, h in enumerate(HOURS_LIST)}
+
 
 # --------------------------------------------------------------------------- #
 # Module-specific expressions
@@ -57,101 +66,170 @@ def _c_activity_setup(model: pyo.ConcreteModel, e: str, y: int, d: int, h: int):
 
     For storage, the total activity is equal to the sum of charge and discharge (w/efficiencies).
     """
-    charge = sum(
-        model.fin[f, ex, y, d, h] * cnf.DATA.get_fxe(e, "input_efficiency", f, y)
-        for f, ex in model.StorsFiE
-        if ex == e
-    )
-    discharge = sum(
-        model.fout[f, ex, y, d, h] / cnf.DATA.get_fxe(e, "output_efficiency", f, y)
-        for f, ex in model.StorsFoE
-        if ex == e
-    )
+    charge = pyo.quicksum(model.fin[f, e, y, d, h] * model._stor_in_eff[f, e, y] for f in model._stor_fin_map[e])
+    discharge = pyo.quicksum(model.fout[f, e, y, d, h] / model._stor_out_eff[f, e, y] for f in model._stor_fout_map[e])
     return model.a[e, y, d, h] == charge + discharge
 
 
 def _c_charge_limit(model: pyo.ConcreteModel, e: str, y: int, d: int, h: int):
     """Limit the storage uptake to the available capacity."""
-    cap_to_act = cnf.DATA.get(e, "capacity_to_activity", y)
-    charge = sum(model.fin[f, ex, y, d, h] for f, ex in model.StorsFiE if ex == e)
-    return charge <= model.ctot[e, y] * cap_to_act
+    if not model._stor_fin_map[e]:  # No connected inflows: nothing to limit
+        return pyo.Constraint.Skip
+    if y == cnf.YEARS[0] and len(model._stor_fin_map[e]) == 1:
+        return pyo.Constraint.Skip  # Enforced as a variable bound in _initialise
+    charge = pyo.quicksum(model.fin[f, e, y, d, h] for f in model._stor_fin_map[e])
+    return charge <= model.ctot[e, y] * model._stor_c2a[e, y]
 
 
 def _c_discharge_limit(model: pyo.ConcreteModel, e: str, y: int, d: int, h: int):
     """Limit the storage depletion to the available capacity."""
-    discharge = sum(model.fout[f, ex, y, d, h] for f, ex in model.StorsFoE if ex == e)
-    return discharge <= model.ctot[e, y] * cnf.DATA.get(e, "capacity_to_activity", y)
+    if not model._stor_fout_map[e]:  # No connected outflows: nothing to limit
+        return pyo.Constraint.Skip
+    if y == cnf.YEARS[0] and len(model._stor_fout_map[e]) == 1:
+        return pyo.Constraint.Skip  # Enforced as a variable bound in _initialise
+    discharge = pyo.quicksum(model.fout[f, e, y, d, h] for f in model._stor_fout_map[e])
+    return discharge <= model.ctot[e, y] * model._stor_c2a[e, y]
 
 
 def _c_soc_limit(model: pyo.ConcreteModel, e: str, y: int, d: int, h: int):
     """Limit the state-of-charge to the available energy capacity."""
-    c_rate = cnf.DATA.get(e, "c_rate", y)
-    cap_to_act = cnf.DATA.get(e, "capacity_to_activity", y)
-    return model.soc[e, y, d, h] <= c_rate * model.ctot[e, y] * cap_to_act
+    return model.soc[e, y, d, h] <= model._stor_soc_max[e, y] * model.ctot[e, y]
 
 
-def _c_soc_flow(model: pyo.ConcreteModel, e: str, y: int, d: int, h: int):
-    """Establish the relation between input-output flows and the state-of-charge."""
-    inflow = sum(
-        model.fin[f, ex, y, d, h] * cnf.DATA.get_fxe(e, "input_efficiency", f, y)
-        for f, ex in model.StorsFiE
-        if ex == e
+def _e_soc(model: pyo.ConcreteModel, e: str, y: int, d: int, h: int):
+    """State-of-charge as a closed-form expression of the in/out flows.
+
+    The old hourly recursion soc[h] = sf*soc[h-1] + HL*(inflow - outflow) is unrolled
+    into geometric weights on the flows, which removes the soc columns and their
+    chained equality rows from the LP (only the bound constraints remain).
+    """
+    standing = model._stor_standing[e, y]
+    k = HOUR_POS[h]
+    soc = (standing**k) * model.sto_p_IniSoC[e]
+    if k == 0:
+        return soc
+    charge = pyo.quicksum(
+        (cnf.TIMESLICE * standing ** (k - j)) * model._stor_in_eff[f, e, y] * model.fin[f, e, y, d, HOURS_LIST[j]]
+        for j in range(1, k + 1)
+        for f in model._stor_fin_map[e]
     )
-    outflow = sum(
-        model.fout[f, ex, y, d, h] / cnf.DATA.get_fxe(e, "output_efficiency", f, y)
-        for f, ex in model.StorsFoE
-        if ex == e
+    discharge = pyo.quicksum(
+        (cnf.TIMESLICE * standing ** (k - j)) / model._stor_out_eff[f, e, y] * model.fout[f, e, y, d, HOURS_LIST[j]]
+        for j in range(1, k + 1)
+        for f in model._stor_fout_map[e]
     )
-    if h == model.H.first():
-        soc_prev = model.sto_p_IniSoC[e]
-    else:
-        standing_eff = cnf.DATA.get(e, "standing_efficiency", y)
-        soc_prev = (standing_eff**model.HL) * model.soc[e, y, d, h - model.HL]
-    return model.soc[e, y, d, h] == soc_prev + model.HL*(inflow - outflow)
+    return soc + charge - discharge
+
+
+def _c_soc_h0_flow(model: pyo.ConcreteModel, e: str, y: int, d: int):
+    """Force zero net flow in the first hour-slice.
+
+    The first slice's SoC is the constant initial value, so its recursion row reduced
+    to HL*(inflow - outflow) == 0; the unrolled expression starts at the second slice
+    and would otherwise leave the first slice's flows unaccounted for.
+    """
+    if not model._stor_fin_map[e] and not model._stor_fout_map[e]:
+        return pyo.Constraint.Skip
+    h_0 = HOURS_LIST[0]
+    charge = pyo.quicksum(model.fin[f, e, y, d, h_0] * model._stor_in_eff[f, e, y] for f in model._stor_fin_map[e])
+    discharge = pyo.quicksum(
+        model.fout[f, e, y, d, h_0] / model._stor_out_eff[f, e, y] for f in model._stor_fout_map[e]
+    )
+    return charge == discharge
+
+
+def _c_soc_min(model: pyo.ConcreteModel, e: str, y: int, d: int, h: int):
+    """Keep the state-of-charge non-negative (soc is an expression, not a bounded variable)."""
+    if h == HOURS_LIST[0]:  # First hour is the constant initial SoC
+        return pyo.Constraint.Skip
+    return model.soc[e, y, d, h] >= 0
 
 
 def _c_soc_intra_day_cyclic(model: pyo.ConcreteModel, e: str, y: int, d: int):
     """Make the state-of-charge cyclic within a year."""
-    return model.soc[e, y, d, model.H.first()] == model.soc[e, y, d, model.H.last()]
+    return model.soc[e, y, d, cnf.HOURS[0]] == model.soc[e, y, d, cnf.HOURS[-1]]
 
 
 # --------------------------------------------------------------------------- #
 # Pyomo Components
 # --------------------------------------------------------------------------- #
-def _init_soc(model: pyo.ConcreteModel, storage_ids: list[str]):
-    """Set the initial state-of-charge of a storage technology."""
-    for e in storage_ids:
-        for y in model.Y:
-            for d in model.D:
-                model.soc[e, y, d, model.H.first()].fix(model.sto_p_IniSoC[e])
+@lru_cache(maxsize=1)
+def _static_indexing(fie_tuple: tuple, foe_tuple: tuple) -> dict:
+    """Build the sector's static index structures and coefficient tables.
+
+    Cached at module level: the inputs and the configuration data never change within
+    a process, so rebuilt models (scenario sweeps, notebook re-runs) reuse the result.
+    """
+    storages = cnf.DATA.entities_with_prefix(GROUP_ID)
+    # One pass over each pair tuple builds both the sector pair set and the per-storage
+    # flow map the hourly rules index instead of filter-scanning the full pair sets
+    fie_stor = [(f, e) for f, e in fie_tuple if e in storages]
+    foe_stor = [(f, e) for f, e in foe_tuple if e in storages]
+    fin_map = {e: [] for e in storages}  # type: dict[str, list]
+    for f, e in fie_stor:
+        fin_map[e].append(f)
+    fout_map = {e: [] for e in storages}  # type: dict[str, list]
+    for f, e in foe_stor:
+        fout_map[e].append(f)
+
+    # Per-(storage, year) configuration lookups, hoisted out of the hourly rules
+    # (the standing factor folds in the hour-slice exponent)
+    c2a = {}
+    soc_max = {}
+    standing = {}
+    for e in storages:
+        for y in cnf.YEARS:
+            cap_to_act = cnf.DATA.get(e, "capacity_to_activity", y)
+            c2a[e, y] = cap_to_act
+            soc_max[e, y] = cnf.DATA.get(e, "c_rate", y) * cap_to_act
+            standing[e, y] = cnf.DATA.get(e, "standing_efficiency", y) ** cnf.TIMESLICE
+    return {
+        "storages": storages,
+        "fie_pairs": fie_stor,
+        "foe_pairs": foe_stor,
+        "fin_map": {e: tuple(flows) for e, flows in fin_map.items()},
+        "fout_map": {e: tuple(flows) for e, flows in fout_map.items()},
+        "c2a": c2a,
+        "soc_max": soc_max,
+        "standing": standing,
+        "in_eff": {
+            (f, e, y): cnf.DATA.get_fxe(e, "input_efficiency", f, y)
+            for e, flows in fin_map.items()
+            for f in flows
+            for y in cnf.YEARS
+        },
+        "out_eff": {
+            (f, e, y): cnf.DATA.get_fxe(e, "output_efficiency", f, y)
+            for e, flows in fout_map.items()
+            for f in flows
+            for y in cnf.YEARS
+        },
+    }
 
 
 def _sets(model: pyo.ConcreteModel):
     """Create sets used by this sector."""
-    storages = set(cnf.ENTITIES[cnf.ENTITIES.str.startswith(GROUP_ID)])
-    model.Stors = pyo.Set(initialize=storages, ordered=False)
-    model.StorsFoE = pyo.Set(
-        within=model.F * model.E,
-        ordered=False,
-        initialize={(f, e) for f, e in model.FoE if e in storages},
-    )
-    model.StorsFiE = pyo.Set(
-        within=model.F * model.E,
-        ordered=False,
-        initialize={(f, e) for f, e in model.FiE if e in storages},
-    )
+    indexing = _static_indexing(model._fie_tuple, model._foe_tuple)
+    model.Stors = pyo.Set(initialize=indexing["storages"], ordered=False)
+    model.StorsFoE = pyo.Set(within=model.F * model.E, ordered=False, initialize=indexing["foe_pairs"])
+    model.StorsFiE = pyo.Set(within=model.F * model.E, ordered=False, initialize=indexing["fie_pairs"])
+    model._stor_fin_map = indexing["fin_map"]
+    model._stor_fout_map = indexing["fout_map"]
+    model._stor_c2a = indexing["c2a"]
+    model._stor_soc_max = indexing["soc_max"]
+    model._stor_standing = indexing["standing"]
+    model._stor_in_eff = indexing["in_eff"]
+    model._stor_out_eff = indexing["out_eff"]
 
 
 def _parameters(model: pyo.ConcreteModel):
     model.sto_p_IniSoC = pyo.Param(model.Stors, initialize=_p_initial_soc)
 
 
-def _variables(model: pyo.ConcreteModel):
-    """Create any internal variables that differ from standard settings."""
-    model.soc = pyo.Var(model.Stors, model.Y, model.D, model.H, domain=pyo.NonNegativeReals, initialize=0)
-
-
 def _expressions(model: pyo.ConcreteModel):
+    # The SoC is an expression of the flows (see _e_soc), not a variable: the first
+    # hour evaluates to the initial-SoC parameter by construction
+    model.soc = pyo.Expression(model.Stors, model.Y, model.D, model.H, rule=_e_soc)
     model.sto_e_CostTotal = pyo.Expression(expr=_e_cost_total(model))
 
 
@@ -161,8 +239,9 @@ def _constraints(model: pyo.ConcreteModel):
     model.sto_c_charge_limit = pyo.Constraint(model.Stors, model.Y, model.D, model.H, rule=_c_charge_limit)
     model.sto_c_discharge_limit = pyo.Constraint(model.Stors, model.Y, model.D, model.H, rule=_c_discharge_limit)
     model.sto_c_soc_limit = pyo.Constraint(model.Stors, model.Y, model.D, model.H, rule=_c_soc_limit)
-    # Flow
-    model.sto_c_soc_flow = pyo.Constraint(model.Stors, model.Y, model.D, model.H, rule=_c_soc_flow)
+    # SoC must stay non-negative: as an expression it no longer carries a variable domain
+    model.sto_c_soc_min = pyo.Constraint(model.Stors, model.Y, model.D, model.H, rule=_c_soc_min)
+    model.sto_c_soc_h0_flow = pyo.Constraint(model.Stors, model.Y, model.D, rule=_c_soc_h0_flow)
     # Temporal connections
     model.sto_c_soc_intra_day_cyclic = pyo.Constraint(model.Stors, model.Y, model.D, rule=_c_soc_intra_day_cyclic)
     # Capacity
@@ -173,10 +252,31 @@ def _constraints(model: pyo.ConcreteModel):
     model.sto_c_activity_setup = pyo.Constraint(model.Stors, model.Y, model.D, model.H, rule=_c_activity_setup)
 
 
+def _init_flow_bounds(model: pyo.ConcreteModel):
+    """Apply the initial-year charge/discharge limits as variable bounds.
+
+    With ctot fixed in the initial year, a limit row over a single connected flow
+    reduces to an upper bound, which the solver handles implicitly instead of as a row.
+    """
+    y_0 = cnf.YEARS[0]
+    for e in model.Stors:
+        limit = cnf.DATA.get_annual(e, "actual_capacity", y_0) * model._stor_c2a[e, y_0]
+        if len(model._stor_fin_map[e]) == 1:
+            f = model._stor_fin_map[e][0]
+            for d in model.D:
+                for h in model.H:
+                    model.fin[f, e, y_0, d, h].setub(limit)
+        if len(model._stor_fout_map[e]) == 1:
+            f = model._stor_fout_map[e][0]
+            for d in model.D:
+                for h in model.H:
+                    model.fout[f, e, y_0, d, h].setub(limit)
+
+
 def _initialise(model: pyo.ConcreteModel):
     """Set initial sector values."""
-    _init_soc(model, model.Stors)
     gen_con.init_capacity(model, model.Stors)
+    _init_flow_bounds(model)
 
 
 # --------------------------------------------------------------------------- #
@@ -194,7 +294,6 @@ def configure_sector(model):
     """Prepare the sector."""
     _sets(model)
     _parameters(model)
-    _variables(model)
     _expressions(model)
     _constraints(model)
     _initialise(model)
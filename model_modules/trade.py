@@ -17,6 +17,8 @@ Each trade entity can be configured in 3 ways:
 
 Capacity is shared between both aimp and aexp variables.
 """
+from functools import lru_cache
+
 import pyomo.environ as pyo
 
 from model_utils import configuration as cnf
@@ -30,136 +32,210 @@ GROUP_ID = "trd_"
 # --------------------------------------------------------------------------- #
 def _e_total_annual_import(model: pyo.ConcreteModel, e: str, y: int):
     """Return the total annual activity of an entity in a year."""
-    if e not in model.TradesImp:
-        return pyo.Expression.Skip
-    return sum(model.DL[y, d] * sum(model.HL * model.aimp[e, y, d, h] for h in model.H) for d in model.D)
+    return pyo.quicksum(model.DL[y, d] * model.HL * model.aimp[e, y, d, h] for d in model._d_tuple for h in model._h_tuple)
 
 
 def _e_total_annual_export(model: pyo.ConcreteModel, e: str, y: int):
     """Return the total annual activity of an entity in a year."""
-    if e not in model.TradesExp:
-        return pyo.Expression.Skip
-    return sum(model.DL[y, d] * sum(model.HL * model.aexp[e, y, d, h] for h in model.H) for d in model.D)
-
-
-def _e_cost_variable_om(model: pyo.ConcreteModel, e: str):
-    """Return the total variable cost due to trade."""
-    cost = 0
-    y_last = model.Y.last()
-    if e in model.TradesImp:
-        cost += sum(
-            model.DISC[y + i] * (cnf.DATA.get(e, "cost_import", y) * model.trd_e_TotalAnnualImport[e, y])
-            for y in model.Y
-            if y != model.Y.last()
-            for i in range(model.YL())
-        )
-        cost += model.DISC[y_last] * (cnf.DATA.get(e, "cost_import", y_last) * model.trd_e_TotalAnnualImport[e, y_last])
-    if e in model.TradesExp:  # Export gives revenue (negative cost)
-        cost -= sum(
-            model.DISC[y + i] * (cnf.DATA.get(e, "revenue_export", y) * model.trd_e_TotalAnnualExport[e, y])
-            for y in model.Y
-            if y != model.Y.last()
-            for i in range(model.YL())
-        )
-        cost -= model.DISC[y_last] * (
-            cnf.DATA.get(e, "revenue_export", y_last) * model.trd_e_TotalAnnualExport[e, y_last]
-        )
-    return cost
+    return pyo.quicksum(model.DL[y, d] * model.HL * model.aexp[e, y, d, h] for d in model._d_tuple for h in model._h_tuple)
+
+
+def _e_cost_import(model: pyo.ConcreteModel, e: str):
+    """Return the total discounted import cost of a trade entity."""
+    # DISCCUM already sums the discount rates over each year-slice, so one term per
+    # year suffices; discount and price are folded into one float coefficient up front
+    coef = {y: pyo.value(model.DISCCUM[y]) * cnf.DATA.get(e, "cost_import", y) for y in model._y_tuple}
+    return pyo.quicksum(coef[y] * model.trd_e_TotalAnnualImport[e, y] for y in model._y_tuple)
+
+
+def _e_cost_export(model: pyo.ConcreteModel, e: str):
+    """Return the total discounted export revenue of a trade entity (a negative cost)."""
+    coef = {y: pyo.value(model.DISCCUM[y]) * cnf.DATA.get(e, "revenue_export", y) for y in model._y_tuple}
+    return -pyo.quicksum(coef[y] * model.trd_e_TotalAnnualExport[e, y] for y in model._y_tuple)
 
 
 def _e_cost_total(model: pyo.ConcreteModel):
     """Calculate the total cost of this module."""
-    return sum(model.e_CostInv[e] + model.e_CostFixedOM[e] + model.trd_e_CostVarOM[e] for e in model.Trades)
+    return (
+        pyo.quicksum(model.e_CostInv[e] + model.e_CostFixedOM[e] for e in model.Trades)
+        + pyo.quicksum(model.trd_e_CostImp[e] for e in model.TradesImp)
+        + pyo.quicksum(model.trd_e_CostExp[e] for e in model.TradesExp)
+    )
 
 
 # --------------------------------------------------------------------------- #
 # Module-specific constraints
 # --------------------------------------------------------------------------- #
-def _c_activity_setup(model: pyo.ConcreteModel, e: str, y: int, d: int, h: int):
-    """Ensure generic and trade-specific activity variables match the model setup.
-
-    For trade, the total activity is equal to the sum of imports and exports.
-    """
-    if not cnf.DATA.check_cnf(e, "enable_import"):
-        model.aimp[e, y, d, h].fix(0)
-    if not cnf.DATA.check_cnf(e, "enable_export"):
-        model.aexp[e, y, d, h].fix(0)
+def _c_act_setup_both(model: pyo.ConcreteModel, e: str, y: int, d: int, h: int):
+    """Link activity to imports and exports (both directions enabled)."""
     return model.a[e, y, d, h] == model.aimp[e, y, d, h] + model.aexp[e, y, d, h]
 
 
+def _c_act_setup_imp(model: pyo.ConcreteModel, e: str, y: int, d: int, h: int):
+    """Link activity to imports (import-only entities)."""
+    return model.a[e, y, d, h] == model.aimp[e, y, d, h]
+
+
+def _c_act_setup_exp(model: pyo.ConcreteModel, e: str, y: int, d: int, h: int):
+    """Link activity to exports (export-only entities)."""
+    return model.a[e, y, d, h] == model.aexp[e, y, d, h]
+
+
 def _c_flow_in(model: pyo.ConcreteModel, e: str, y: int, d: int, h: int):
     """Balance entity inflows to its activity."""
-    return model.aexp[e, y, d, h] == sum(
-        model.fin[f, ex, y, d, h] * cnf.DATA.get_fxe(ex, "input_efficiency", f, y) for (f, ex) in model.FiE if ex == e
+    # The coefficients are plain floats, so the expression is assembled in one go
+    # instead of chaining one monomial object per term
+    pairs = model._trade_fin_eff[e, y]
+    inflow = pyo.LinearExpression(
+        constant=0,
+        linear_coefs=[eff for _, eff in pairs],
+        linear_vars=[model.fin[f, e, y, d, h] for f, _ in pairs],
     )
+    if e not in model._trades_exp:  # Export disabled: connected inflows must stay unused
+        return inflow == 0
+    return model.aexp[e, y, d, h] == inflow
 
 
 def _c_flow_out(model: pyo.ConcreteModel, e: str, y: int, d: int, h: int):
     """Balance entity outflows to its activity."""
-    return model.aimp[e, y, d, h] == sum(
-        model.fout[f, ex, y, d, h] / cnf.DATA.get_fxe(ex, "output_efficiency", f, y) for (f, ex) in model.FoE if ex == e
+    pairs = model._trade_fout_eff[e, y]
+    outflow = pyo.LinearExpression(
+        constant=0,
+        linear_coefs=[inv_eff for _, inv_eff in pairs],
+        linear_vars=[model.fout[f, e, y, d, h] for f, _ in pairs],
     )
+    if e not in model._trades_imp:  # Import disabled: connected outflows must stay unused
+        return outflow == 0
+    return model.aimp[e, y, d, h] == outflow
 
 
 def _c_act_max_import_annual(model: pyo.ConcreteModel, e: str, y: int):
     """Limit maximum imports."""
-    if e not in model.TradesImp:
-        return pyo.Constraint.Skip
-    max_act_annual = cnf.DATA.get_const(e, "max_activity_annual")
-    if max_act_annual is None:
-        return pyo.Constraint.Skip
-    return model.trd_e_TotalAnnualImport[e, y] <= max_act_annual
+    return model.trd_e_TotalAnnualImport[e, y] <= model._trades_imp_bounded[e]
 
 
 def _c_act_max_export_annual(model: pyo.ConcreteModel, e: str, y: int):
     """Limit maximum exports."""
-    if e not in model.TradesExp:
-        return pyo.Constraint.Skip
-    max_act_annual = cnf.DATA.get_const(e, "max_activity_annual")
-    if max_act_annual is None:
-        return pyo.Constraint.Skip
-    return model.trd_e_TotalAnnualExport[e, y] <= max_act_annual
+    return model.trd_e_TotalAnnualExport[e, y] <= model._trades_exp_bounded[e]
 
 
 # --------------------------------------------------------------------------- #
 # Pyomo Components
 # --------------------------------------------------------------------------- #
+@lru_cache(maxsize=1)
+def _static_indexing(fie_tuple: tuple, foe_tuple: tuple) -> dict:
+    """Build the sector's static index structures and coefficient tables.
+
+    Cached at module level: the inputs and the configuration data never change within
+    a process, so rebuilt models (scenario sweeps, notebook re-runs) reuse the result.
+    """
+    trades = cnf.DATA.entities_with_prefix(GROUP_ID)
+    trades_imp = frozenset(cnf.DATA.build_cnf_set(trades, "enable_import"))
+    trades_exp = frozenset(cnf.DATA.build_cnf_set(trades, "enable_export"))
+    # One pass over each pair tuple builds both the sector pair set and the per-trade
+    # flow map the hourly rules index instead of filter-scanning the full pair sets
+    fie_trd = [(f, e) for f, e in fie_tuple if e in trades]
+    foe_trd = [(f, e) for f, e in foe_tuple if e in trades]
+    fin_map = {e: [] for e in trades}  # type: dict[str, list]
+    for f, e in fie_trd:
+        fin_map[e].append(f)
+    fout_map = {e: [] for e in trades}  # type: dict[str, list]
+    for f, e in foe_trd:
+        fout_map[e].append(f)
+    fin_map = {e: tuple(flows) for e, flows in fin_map.items()}
+    fout_map = {e: tuple(flows) for e, flows in fout_map.items()}
+    return {
+        "trades": trades,
+        "imp": trades_imp,
+        "exp": trades_exp,
+        # Direction-mode partition: the activity linking constraints are specialized
+        # per mode, so no rule branches on the configuration at build time
+        "both": sorted(trades_imp & trades_exp),
+        "imp_only": sorted(trades_imp - trades_exp),
+        "exp_only": sorted(trades_exp - trades_imp),
+        # Entities with a configured annual bound: the annual limit constraints are
+        # declared over these only, so no rule runs just to skip itself
+        "imp_bounded": {
+            e: cnf.DATA.get_const(e, "max_activity_annual")
+            for e in trades_imp
+            if cnf.DATA.get_const(e, "max_activity_annual") is not None
+        },
+        "exp_bounded": {
+            e: cnf.DATA.get_const(e, "max_activity_annual")
+            for e in trades_exp
+            if cnf.DATA.get_const(e, "max_activity_annual") is not None
+        },
+        "fie_pairs": fie_trd,
+        "foe_pairs": foe_trd,
+        "fin_map": fin_map,
+        "fout_map": fout_map,
+        # The flow balances are declared over the connected or direction-enabled
+        # entities: an enabled direction with nothing connected still needs its
+        # aexp == 0 / aimp == 0 row, or the variable would be free revenue
+        "fin_active": sorted({e for e, flows in fin_map.items() if flows} | trades_exp),
+        "fout_active": sorted({e for e, flows in fout_map.items() if flows} | trades_imp),
+        # Flow efficiency coefficients per (entity, year), resolved once: the hourly
+        # balances iterate (flow, coefficient) pairs with no data-layer calls per cell
+        # (the output efficiency is stored inverted so the rules only multiply)
+        "fin_eff": {
+            (e, y): tuple((f, cnf.DATA.get_fxe(e, "input_efficiency", f, y)) for f in fin_map[e])
+            for e in trades
+            for y in cnf.YEARS
+        },
+        "fout_eff": {
+            (e, y): tuple((f, 1 / cnf.DATA.get_fxe(e, "output_efficiency", f, y)) for f in fout_map[e])
+            for e in trades
+            for y in cnf.YEARS
+        },
+    }
+
+
 def _sets(model: pyo.ConcreteModel):
     """Create sets used by this sector."""
-    trades = set(cnf.ENTITIES[cnf.ENTITIES.str.startswith(GROUP_ID)])
-    model.Trades = pyo.Set(initialize=trades, ordered=False)
-    model.TradesImp = pyo.Set(initialize=cnf.DATA.build_cnf_set(trades, "enable_import"), ordered=False)
-    model.TradesExp = pyo.Set(initialize=cnf.DATA.build_cnf_set(trades, "enable_export"), ordered=False)
-    model.TradesFoE = pyo.Set(
-        within=model.F * model.E,
-        ordered=False,
-        initialize={(f, e) for f, e in model.FoE if e in trades},
-    )
-    model.TradesFiE = pyo.Set(
-        within=model.F * model.E,
-        ordered=False,
-        initialize={(f, e) for f, e in model.FiE if e in trades},
-    )
+    indexing = _static_indexing(model._fie_tuple, model._foe_tuple)
+    model.Trades = pyo.Set(initialize=indexing["trades"], ordered=False)
+    model.TradesImp = pyo.Set(initialize=indexing["imp"], ordered=False)
+    model.TradesExp = pyo.Set(initialize=indexing["exp"], ordered=False)
+    model.TradesFoE = pyo.Set(within=model.F * model.E, ordered=False, initialize=indexing["foe_pairs"])
+    model.TradesFiE = pyo.Set(within=model.F * model.E, ordered=False, initialize=indexing["fie_pairs"])
+    model._trades_imp = indexing["imp"]
+    model._trades_exp = indexing["exp"]
+    model._trades_both = indexing["both"]
+    model._trades_imp_only = indexing["imp_only"]
+    model._trades_exp_only = indexing["exp_only"]
+    model._trades_imp_bounded = indexing["imp_bounded"]
+    model._trades_exp_bounded = indexing["exp_bounded"]
+    model._trade_fin_map = indexing["fin_map"]
+    model._trade_fout_map = indexing["fout_map"]
+    model._trades_fin_active = indexing["fin_active"]
+    model._trades_fout_active = indexing["fout_active"]
+    model._trade_fin_eff = indexing["fin_eff"]
+    model._trade_fout_eff = indexing["fout_eff"]
 
 
 def _variables(model: pyo.ConcreteModel):
     """Create any internal variables that differ from standard settings."""
-    model.aimp = pyo.Var(model.Trades, model.Y, model.D, model.H, domain=pyo.NonNegativeReals, initialize=0)
-    model.aexp = pyo.Var(model.Trades, model.Y, model.D, model.H, domain=pyo.NonNegativeReals, initialize=0)
+    # Declared only over the enabled direction subsets: disabled directions used to be
+    # columns fixed to zero, now they simply do not exist in the LP
+    model.aimp = pyo.Var(model.TradesImp, model.Y, model.D, model.H, domain=pyo.NonNegativeReals, initialize=0)
+    model.aexp = pyo.Var(model.TradesExp, model.Y, model.D, model.H, domain=pyo.NonNegativeReals, initialize=0)
 
 
 def _expressions(model: pyo.ConcreteModel):
     model.trd_e_TotalAnnualImport = pyo.Expression(model.TradesImp, model.Y, rule=_e_total_annual_import)
     model.trd_e_TotalAnnualExport = pyo.Expression(model.TradesExp, model.Y, rule=_e_total_annual_export)
-    model.trd_e_CostVarOM = pyo.Expression(model.Trades, rule=_e_cost_variable_om)
+    # Variable-OM cost split per direction: each component is declared over the
+    # entities it applies to, so no rule tests the configuration
+    model.trd_e_CostImp = pyo.Expression(model.TradesImp, rule=_e_cost_import)
+    model.trd_e_CostExp = pyo.Expression(model.TradesExp, rule=_e_cost_export)
     model.trd_e_CostTotal = pyo.Expression(expr=_e_cost_total(model))
 
 
 def _constraints(model: pyo.ConcreteModel):
     """Set sector constraints."""
-    # Input/output
-    model.trd_c_flow_in = pyo.Constraint(model.Trades, model.Y, model.D, model.H, rule=_c_flow_in)
-    model.trd_c_flow_out = pyo.Constraint(model.Trades, model.Y, model.D, model.H, rule=_c_flow_out)
+    # Input/output, declared over the connected entities only
+    model.trd_c_flow_in = pyo.Constraint(model._trades_fin_active, model.Y, model.D, model.H, rule=_c_flow_in)
+    model.trd_c_flow_out = pyo.Constraint(model._trades_fout_active, model.Y, model.D, model.H, rule=_c_flow_out)
     model.trd_c_flow_in_share_max = pyo.Constraint(
         model.TradesFiE, model.Y, model.D, model.H, rule=gen_con.c_flow_in_share_max
     )
@@ -170,16 +246,27 @@ def _constraints(model: pyo.ConcreteModel):
     model.trd_c_cap_max_annual = pyo.Constraint(model.Trades, model.Y, rule=gen_con.c_cap_max_annual)
     model.trd_c_cap_transfer = pyo.Constraint(model.Trades, model.Y, rule=gen_con.c_cap_transfer)
     model.trd_c_cap_buildrate = pyo.Constraint(model.Trades, model.Y, rule=gen_con.c_cap_buildrate)
-    # Activity
-    model.trd_c_act_setup = pyo.Constraint(model.Trades, model.Y, model.D, model.H, rule=_c_activity_setup)
+    # Activity linking, specialized per direction mode
+    model.trd_c_act_setup_both = pyo.Constraint(model._trades_both, model.Y, model.D, model.H, rule=_c_act_setup_both)
+    model.trd_c_act_setup_imp = pyo.Constraint(model._trades_imp_only, model.Y, model.D, model.H, rule=_c_act_setup_imp)
+    model.trd_c_act_setup_exp = pyo.Constraint(model._trades_exp_only, model.Y, model.D, model.H, rule=_c_act_setup_exp)
+    # Entities with both directions disabled used to get a == 0 rows; fix the
+    # activity variable directly instead
+    for e in model.Trades:
+        if e not in model._trades_imp and e not in model._trades_exp:
+            model.a[e, :, :, :].fix(0)
     model.trd_c_act_cf_min_hour = pyo.Constraint(
         model.Trades, model.Y, model.D, model.H, rule=gen_con.c_act_cf_min_hour
     )
     model.trd_c_act_cf_max_hour = pyo.Constraint(
         model.Trades, model.Y, model.D, model.H, rule=gen_con.c_act_cf_max_hour
     )
-    model.trd_c_act_max_imp_annual = pyo.Constraint(model.Trades, model.Y, rule=_c_act_max_import_annual)
-    model.trd_c_act_max_exp_annual = pyo.Constraint(model.Trades, model.Y, rule=_c_act_max_export_annual)
+    model.trd_c_act_max_imp_annual = pyo.Constraint(
+        sorted(model._trades_imp_bounded), model.Y, rule=_c_act_max_import_annual
+    )
+    model.trd_c_act_max_exp_annual = pyo.Constraint(
+        sorted(model._trades_exp_bounded), model.Y, rule=_c_act_max_export_annual
+    )
 
 
 def _initialise(model: pyo.ConcreteModel):
@@ -28,23 +28,66 @@ def _e_cost_total(model: pyo.ConcreteModel):
     return sum(model.e_CostVarOM[e] for e in model.ETrans)
 
 
+# --------------------------------------------------------------------------- #
+# Module-specific constraints
+# --------------------------------------------------------------------------- #
+def _c_flow_in(model: pyo.ConcreteModel, e: str, y: int, d: int, h: int):
+    """Balance entity inflows to its activity."""
+    # The coefficients are plain floats, so the expression is assembled in one go
+    # instead of chaining one monomial object per term
+    pairs = model._etrans_fin_eff[e, y]
+    inflow = pyo.LinearExpression(
+        constant=0,
+        linear_coefs=[eff for _, eff in pairs],
+        linear_vars=[model.fin[f, e, y, d, h] for f, _ in pairs],
+    )
+    return inflow == model.a[e, y, d, h]
+
+
+def _c_flow_out(model: pyo.ConcreteModel, e: str, y: int, d: int, h: int):
+    """Balance entity outflows to its activity."""
+    pairs = model._etrans_fout_eff[e, y]
+    outflow = pyo.LinearExpression(
+        constant=0,
+        linear_coefs=[inv_eff for _, inv_eff in pairs],
+        linear_vars=[model.fout[f, e, y, d, h] for f, _ in pairs],
+    )
+    return outflow == model.a[e, y, d, h]
+
+
 # --------------------------------------------------------------------------- #
 # Pyomo Components
 # --------------------------------------------------------------------------- #
 def _sets(model: pyo.ConcreteModel):
     """Create sets used by this sector."""
-    storages = set(cnf.ENTITIES[cnf.ENTITIES.str.startswith(GROUP_ID)])
-    model.ETrans = pyo.Set(initialize=storages, ordered=False)
-    model.ETransFoE = pyo.Set(
-        within=model.F * model.E,
-        ordered=False,
-        initialize={(f, e) for f, e in model.FoE if e in storages},
-    )
-    model.ETransFiE = pyo.Set(
-        within=model.F * model.E,
-        ordered=False,
-        initialize={(f, e) for f, e in model.FiE if e in storages},
-    )
+    etrans = cnf.DATA.entities_with_prefix(GROUP_ID)
+    model.ETrans = pyo.Set(initialize=etrans, ordered=False)
+    # One pass over each pair tuple builds the sector pair set and the per-entity flow
+    # map the hourly balances use instead of filter-scanning the full FiE/FoE sets
+    fie_trn = [(f, e) for f, e in model._fie_tuple if e in etrans]
+    foe_trn = [(f, e) for f, e in model._foe_tuple if e in etrans]
+    model.ETransFoE = pyo.Set(within=model.F * model.E, ordered=False, initialize=foe_trn)
+    model.ETransFiE = pyo.Set(within=model.F * model.E, ordered=False, initialize=fie_trn)
+    # Direction-specific entity subsets: the flow balances are declared over these, so
+    # entities with no connections in a direction never reach the rule
+    etrans_in = sorted({e for _, e in fie_trn})
+    etrans_out = sorted({e for _, e in foe_trn})
+    model.ETransIn = pyo.Set(initialize=etrans_in, ordered=False)
+    model.ETransOut = pyo.Set(initialize=etrans_out, ordered=False)
+
+    # Flow efficiency coefficients per (entity, year), resolved once: the hourly
+    # balances iterate (flow, coefficient) pairs with no data-layer calls per cell
+    # (the output efficiency is stored inverted so the rules only multiply)
+    model._etrans_fin_eff = {
+        (e, y): tuple((f, cnf.DATA.get_fxe(e, "input_efficiency", f, y)) for f, ee in fie_trn if ee == e)
+        for e in etrans_in
+        for y in cnf.YEARS
+    }
+    model._etrans_fout_eff = {
+        (e, y): tuple((f, 1 / cnf.DATA.get_fxe(e, "output_efficiency", f, y)) for f, ee in foe_trn if ee == e)
+        for e in etrans_out
+        for y in cnf.YEARS
+    }
 
 
 def _expressions(model: pyo.ConcreteModel):
@@ -53,9 +96,14 @@ def _expressions(model: pyo.ConcreteModel):
 
 def _constraints(model: pyo.ConcreteModel):
     """Set sector constraints."""
-    # Input/output
-    model.etrans_c_flow_in = pyo.Constraint(model.ETrans, model.Y, model.D, model.H, rule=gen_con.c_flow_in)
-    model.etrans_c_flow_out = pyo.Constraint(model.ETrans, model.Y, model.D, model.H, rule=gen_con.c_flow_out)
+    # Input/output, declared over the connected entities only
+    model.etrans_c_flow_in = pyo.Constraint(model.ETransIn, model.Y, model.D, model.H, rule=_c_flow_in)
+    model.etrans_c_flow_out = pyo.Constraint(model.ETransOut, model.Y, model.D, model.H, rule=_c_flow_out)
+    # Entities missing a direction used to get trivial 0 == a rows from the generic
+    # balances; pin the activity variable directly instead of emitting those rows
+    for e in model.ETrans:
+        if e not in model.ETransIn or e not in model.ETransOut:
+            model.a[e, :, :, :].fix(0)
 
 
 def _initialise(model: pyo.ConcreteModel):
@@ -17,6 +17,12 @@ import numpy as np
 from data.zenodo_to_cnf import CNF_INDEX
 
 
+def _validate(value, key: tuple) -> Any:
+    """Check that a configuration value is numeric, converting empty (NaN) values to None."""
+    assert isinstance(value, Number), f"Invalid: {key}"
+    return None if np.isnan(value) else value
+
+
 def get_flow_entity_dict(io_df: pd.DataFrame, by_entity=False) -> dict[str, list]:
     """Create a dictionary with the flows as keys, and the connected processes as the item (in list)."""
     flows = io_df.columns
@@ -27,6 +33,38 @@ def get_flow_entity_dict(io_df: pd.DataFrame, by_entity=False) -> dict[str, list
     return {k: v for k, v in io_dict.items() if v}  # Get rid of empty flows
 
 
+def cache_flow_entity_index(model, pair_set_id: str) -> dict[str, list]:
+    """Return {flow: [entities]} for an FxE pair set ("FiE" or "FoE"), cached on the model.
+
+    Repeated calls (common in plotting notebooks) reuse the cached index instead of
+    re-scanning the full pair set.
+    """
+    attr = f"_{pair_set_id.lower()}_by_flow"
+    if not hasattr(model, attr):
+        index = {}  # type: dict[str, list]
+        for f, e in getattr(model, pair_set_id):
+            index.setdefault(f, []).append(e)
+        setattr(model, attr, index)
+    return getattr(model, attr)
+
+
+def cache_group_entities(model, group_ids: list, caps_only: bool = True) -> list:
+    """Return the sorted entities matching a list of group ids, cached on the model.
+
+    Spares the plot helpers from re-scanning every entity id on each call.
+    """
+    key = (tuple(sorted(group_ids)), caps_only)
+    cache = getattr(model, "_group_entity_cache", None)
+    if cache is None:
+        cache = {}
+        model._group_entity_cache = cache
+    if key not in cache:
+        cache[key] = sorted(
+            {e for group in group_ids for e in model.E if group in e and (not caps_only or e in model.Caps)}
+        )
+    return cache[key]
+
+
 def merge_dicts(dict1: dict, dict2: dict) -> dict:
     """Combine two dictionaries, keeping the values of both.
 
@@ -138,8 +176,37 @@ class DataHandler:
 
                         params[entity_id][data_type] = entity_df.to_dict()[entity_id]
 
+        # Flatten the nested per-entity dictionaries into one dictionary per data type,
+        # keyed by (entity, parameter, ...): getters then resolve a value with a single
+        # hash lookup, and validation/NaN-to-None conversion happen once at load time
+        flat = {
+            t: {}
+            for t in ("constant", "configuration", "constant_fxe", "configuration_fxe", "annual", "annual_fxe")
+        }
+        for entity_id, entity_params in params.items():
+            for data_type, values in entity_params.items():
+                store = flat[data_type]
+                for key, value in values.items():
+                    full_key = (entity_id,) + (key if isinstance(key, tuple) else (key,))
+                    store[full_key] = _validate(value, full_key)
+
         self.fxe = fxe
         self.params = params
+        self._const = flat["constant"]
+        self._config = flat["configuration"]
+        self._const_fxe = flat["constant_fxe"]
+        self._config_fxe = flat["configuration_fxe"]
+        self._annual = flat["annual"]
+        self._annual_fxe = flat["annual_fxe"]
+
+        # Entity prefix kinds ("conv", "dem", "sto", ...), kept categorical so group
+        # filters compare int8 codes instead of re-parsing strings at every call site
+        entities = pd.merge(fxe["FiE"], fxe["FoE"], how="outer", left_index=True, right_index=True).index
+        self.entity_kind = pd.Series(
+            entities.str.extract(r"^([a-z]+)_", expand=False), index=entities, dtype="category"
+        )
+        self._entities = entities
+        self._prefix_cache = {}  # type: dict[str, frozenset]
 
     # ------------------------------------------------------------- #
     # Specific gets (stringent)
@@ -150,90 +217,103 @@ class DataHandler:
         Turns functionality on/off. Empty values cause deactivation, not failure.
         """
         try:
-            value = self.params[entity_id]["configuration"][parameter]
+            return self._config[(entity_id, parameter)]
         except KeyError as exc:
             raise KeyError("Invalid key for", entity_id, parameter) from exc
 
-        assert np.isnan(value) or isinstance(value, Number), f"Invalid: {entity_id}, {parameter}"
-        return None if np.isnan(value) else value
-
     def get_const(self, entity_id: str, parameter: str) -> Any:
         """Return configuration constants.
 
         Empty values return None.
         """
         try:
-            value = self.params[entity_id]["constant"][parameter]
+            return self._const[(entity_id, parameter)]
         except KeyError as exc:
             raise KeyError("Invalid key for", entity_id, parameter) from exc
 
-        assert isinstance(value, Number) or np.isnan(value), f"Invalid: {entity_id}, {parameter}"
-        return None if np.isnan(value) else value
-
     def get_const_fxe(self, entity_id, parameter, flow):
         """Return flow-specific constants.
 
         Empty values return None.
         """
         try:
-            value = self.params[entity_id]["constant_fxe"][(parameter, flow)]
+            return self._const_fxe[(entity_id, parameter, flow)]
         except KeyError as exc:
             raise KeyError("Invalid key for", entity_id, parameter, flow) from exc
 
-        assert isinstance(value, Number) or np.isnan(value), f"Invalid: {entity_id}, {parameter}, {flow}"
-        return None if np.isnan(value) else value
-
     def get_annual(self, entity_id, parameter, year):
         """Return historic values."""
-        value = self.params[entity_id]["annual"][(parameter, year)]
-
-        assert isinstance(value, Number) or np.isnan(value), f"Invalid: {entity_id}, {parameter}, {year}"
-        return None if np.isnan(value) else value
+        return self._annual[(entity_id, parameter, year)]
 
     def get_annual_fxe(self, entity_id, parameter, flow, year):
         """Return flow-specific historic values."""
         # Trying to read empty annual data should cause an error to minimise bugs.
-        value = self.params[entity_id]["annual_fxe"][(parameter, flow, year)]
+        return self._annual_fxe[(entity_id, parameter, flow, year)]
+
+    # ------------------------------------------------------------- #
+    # Vectorized gets
+    # ------------------------------------------------------------- #
+    def get_annual_vec(self, entity_id, parameter, years) -> np.ndarray:
+        """Return historic values for several years as one float array (empty values become NaN)."""
+        values = (self.get_annual(entity_id, parameter, y) for y in years)
+        return np.fromiter((np.nan if v is None else v for v in values), np.float64, count=len(years))
+
+    def get_fxe_vec(self, entity_id, parameter, flow, years) -> np.ndarray:
+        """Return flow-specific values for several years as one float array, checking constants first.
 
-        assert isinstance(value, Number) or np.isnan(value), f"Invalid: {entity_id}, {parameter}, {flow}, {year}"
-        return None if np.isnan(value) else value
+        Empty values become NaN.
+        """
+        values = (self.get_fxe(entity_id, parameter, flow, y) for y in years)
+        return np.fromiter((np.nan if v is None else v for v in values), np.float64, count=len(years))
 
     # ------------------------------------------------------------- #
-    # Generic gets  #TODO: needs rework. Should be a single dictionary with (Type, Param, Entity, Flow, Year)
+    # Generic gets
     # ------------------------------------------------------------- #
     def get(self, entity_id, parameter, year, trigger_error=False):
         """Get a parameter, checking constants first."""
         value = None
         found = False
-        if "annual" in self.params[entity_id] and (parameter, year) in self.params[entity_id]["annual"]:
+        if (entity_id, parameter, year) in self._annual:
             found = True
-            value = self.get_annual(entity_id, parameter, year)
-        if value is None and "constant" in self.params[entity_id] and parameter in self.params[entity_id]["constant"]:
+            value = self._annual[(entity_id, parameter, year)]
+        if value is None and (entity_id, parameter) in self._const:
             found = True
-            value = self.get_const(entity_id, parameter)
-        if not found and trigger_error:
-            raise KeyError("Parameter", parameter, "not found for", entity_id)
+            value = self._const[(entity_id, parameter)]
+        if not found:
+            if entity_id not in self.params:  # Mistyped ids must fail, not return None
+                raise KeyError("Unknown entity", entity_id)
+            if trigger_error:
+                raise KeyError("Parameter", parameter, "not found for", entity_id)
         return value
 
     def get_fxe(self, entity_id, parameter, flow, year, trigger_error=False):
         """Get a FxE parameter, checking constants first."""
         value = None
         found = False
-        if "annual_fxe" in self.params[entity_id] and (parameter, flow, year) in self.params[entity_id]["annual_fxe"]:
+        if (entity_id, parameter, flow, year) in self._annual_fxe:
+            found = True
+            value = self._annual_fxe[(entity_id, parameter, flow, year)]
+        if value is None and (entity_id, parameter, flow) in self._const_fxe:
             found = True
-            value = self.get_annual_fxe(entity_id, parameter, flow, year)
-        if value is None:
-            if "constant_fxe" in self.params[entity_id] and (parameter, flow) in self.params[entity_id]["constant_fxe"]:
-                found = True
-                value = self.get_const_fxe(entity_id, parameter, flow)
-        if not found and trigger_error:
-            raise KeyError("Parameter", parameter, "not found for", entity_id, "and", flow)
+            value = self._const_fxe[(entity_id, parameter, flow)]
+        if not found:
+            if entity_id not in self.params:  # Mistyped ids must fail, not return None
+                raise KeyError("Unknown entity", entity_id)
+            if trigger_error:
+                raise KeyError("Parameter", parameter, "not found for", entity_id, "and", flow)
         return value
 
+    def entities_with_prefix(self, prefix: str) -> frozenset:
+        """Return the entity ids starting with a group prefix.
+
+        Cached per prefix so repeated model builds skip the pandas string scan.
+        """
+        if prefix not in self._prefix_cache:
+            self._prefix_cache[prefix] = frozenset(self._entities[self._entities.str.startswith(prefix)])
+        return self._prefix_cache[prefix]
+
     # Configuration sets
     def build_cnf_set(self, entity_set: set, parameter: str):
         """Create a set where the given configuration is enabled."""
-        config_enabled = set()
-        config_enabled = [i for i in entity_set if self.check_cnf(i, parameter) == 1]
-
-        return set(config_enabled)
+        config = self._config
+        return {i for i in entity_set if config[(i, parameter)] == 1}
@@ -26,20 +26,11 @@ from model_generic import generic_expressions as gen_expr
 
 def _c_io_balance(model: pyo.ConcreteModel, flow_id: str, y: int, d: int, h: int):
     """Balance inputs and outputs at every flow bus."""
-    outflows_prev = sum(model.fout[f, e, y, d, h] for (f, e) in model.FoE if f == flow_id)
-    inflows_next = sum(model.fin[f, e, y, d, h] for (f, e) in model.FiE if f == flow_id)
+    outflows_prev = sum(model.fout[flow_id, e, y, d, h] for e in model._foe_by_flow.get(flow_id, ()))
+    inflows_next = sum(model.fin[flow_id, e, y, d, h] for e in model._fie_by_flow.get(flow_id, ()))
     return outflows_prev == inflows_next
 
 
-def _discount_rates(model, y):
-    discount = cnf.DATA.get_const("country", "discount_factor")
-    return 1 / np.power(1 + discount, (y - model.Y0.first()))
-
-
-def _day_share(model: pyo.ConcreteModel, y, d):  # TODO: Placeholder. This should be obtained from the K-means file
-    return 365 / len(model.D)
-
-
 def _init_sets(model: pyo.ConcreteModel) -> pyo.ConcreteModel:
     # Temporal (1xN)
     model.Y = pyo.Set(initialize=cnf.YEARS, ordered=True)
@@ -49,6 +40,15 @@ def _init_sets(model: pyo.ConcreteModel) -> pyo.ConcreteModel:
     model.DALL = pyo.Set(initialize=range(365), ordered=True)
     model.H = pyo.Set(initialize=cnf.HOURS, ordered=True)
     model.H0 = pyo.Set(initialize=[cnf.HOURS[0]], ordered=True)
+    # Shared by the ramping constraints: built once instead of re-running the
+    # H - H0 set difference in every sector
+    model.HnoH0 = pyo.Set(initialize=cnf.HOURS[1:], ordered=True)
+    # Plain-tuple views of the temporal sets: the annual-total and cost rules loop
+    # these many thousands of times, and native tuple iteration skips the Pyomo
+    # ordered-set iterator dispatch
+    model._y_tuple = tuple(cnf.YEARS.tolist())
+    model._d_tuple = tuple(cnf.DAYS.tolist())
+    model._h_tuple = tuple(cnf.HOURS.tolist())
 
     # Structural (1xN)
     entities = set(cnf.ENTITIES)
@@ -57,7 +57,10 @@ def _init_sets(model: pyo.ConcreteModel) -> pyo.ConcreteModel:
     model.F = pyo.Set(initialize=flows, ordered=False)
 
     # Entity groupings (1xN)
-    demands = set(cnf.ENTITIES[cnf.ENTITIES.str.startswith("dem_")])
+    # Group on the categorical prefix kinds computed once at data load
+    kind = cnf.DATA.entity_kind
+    groups = {k: set(ids.index) for k, ids in kind.groupby(kind, observed=True)}
+    demands = groups.get("dem", set())
     processes = entities - demands
     model.Pros = pyo.Set(initialize=processes, ordered=False)  # TODO: eliminate
     capacity = cnf.DATA.build_cnf_set(processes, "enable_capacity")
@@ -67,9 +70,25 @@ def _init_sets(model: pyo.ConcreteModel) -> pyo.ConcreteModel:
     # See https://github.com/brentertainer/pyomo-tutorials/blob/master/intermediate/05-indexed-sets.ipynb
     f_in = data_handler.get_flow_entity_dict(cnf.DATA.fxe["FiE"])  # Must not contain Extractions
     f_out = data_handler.get_flow_entity_dict(cnf.DATA.fxe["FoE"])  # Must not contain Demands
+    # Iterate the sparse connection dicts directly instead of flows x per-flow lookups
+    fie_pairs = {(f, e) for f, entity_ids in f_in.items() for e in entity_ids}
+    foe_pairs = {(f, e) for f, entity_ids in f_out.items() for e in entity_ids}
     fxe = model.F * model.E
-    model.FiE = pyo.Set(within=fxe, ordered=False, initialize={(f, e) for f in flows for e in f_in[f]})
-    model.FoE = pyo.Set(within=fxe, ordered=False, initialize={(f, e) for f in flows for e in f_out[f]})
+    model.FiE = pyo.Set(within=fxe, ordered=False, initialize=fie_pairs)
+    model.FoE = pyo.Set(within=fxe, ordered=False, initialize=foe_pairs)
+
+    # Keep the per-flow entity lists so constraint rules avoid filter-scans over FiE/FoE
+    model._fie_by_flow = f_in
+    model._foe_by_flow = f_out
+    # Plain tuples of the same pairs: sector _sets filter these instead of going
+    # through the Pyomo set iterator on every build
+    model._fie_tuple = tuple(sorted(fie_pairs))
+    model._foe_tuple = tuple(sorted(foe_pairs))
+    # Structure-of-arrays view of the same pairs, for vectorized membership filters (np.isin)
+    fie_arr = np.array(sorted(fie_pairs))
+    model._fie_f, model._fie_e = fie_arr[:, 0], fie_arr[:, 1]
+    foe_arr = np.array(sorted(foe_pairs))
+    model._foe_f, model._foe_e = foe_arr[:, 0], foe_arr[:, 1]
 
     return model
 
@@ -89,10 +108,24 @@ def _init_variables(model: pyo.ConcreteModel) -> pyo.ConcreteModel:
 
 
 def _init_parameters(model: pyo.ConcreteModel) -> pyo.ConcreteModel:
+    # Pre-evaluate parameter values so Pyomo takes them straight from dicts (no per-index rule calls)
+    discount = cnf.DATA.get_const("country", "discount_factor")
+    years_all = np.arange(cnf.YEARS[0], cnf.YEARS[-1] + 1)
+    rates = 1 / np.power(1 + discount, years_all - years_all[0])
+    disc_rates = dict(zip(years_all.tolist(), rates.tolist()))
+    # TODO: Placeholder day share. This should be obtained from the K-means file
+    day_shares = {(y, d): 365 / len(cnf.DAYS) for y in cnf.YEARS for d in cnf.DAYS}
+
     model.YL = pyo.Param(initialize=cnf.YEARSLICE, doc="Length of a year-slice in the model, in years")
-    model.DL = pyo.Param(model.Y, model.D, initialize=_day_share, mutable=True, doc="Number of days represented")
+    model.DL = pyo.Param(model.Y, model.D, initialize=day_shares, mutable=True, doc="Number of days represented")
     model.HL = pyo.Param(initialize=cnf.TIMESLICE, doc="Length of an hour-slice in the model, in hours")
-    model.DISC = pyo.Param(model.YALL, initialize=_discount_rates, doc="Discount Rates")
+    model.DISCRATE = pyo.Param(model.YALL, initialize=disc_rates, doc="Discount Rates")
+
+    # Discount rates summed over each year-slice (the last modelled year only counts itself).
+    # Lets cost expressions use one term per modelled year instead of one per non-modelled year.
+    disc_cum = {y: sum(disc_rates[y + i] for i in range(cnf.YEARSLICE)) for y in cnf.YEARS[:-1]}
+    disc_cum[cnf.YEARS[-1]] = disc_rates[cnf.YEARS[-1]]
+    model.DISCCUM = pyo.Param(model.Y, initialize=disc_cum, doc="Discount Rates, cumulative per year-slice")
 
     return model
 
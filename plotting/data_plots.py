@@ -9,9 +9,11 @@
 # --------------------------------------------------------------------------- #
 """Graph generating utilities for model data."""
 import networkx as nx
+import numpy as np
 import pandas as pd
 from pyomo.environ import ConcreteModel
 
+from model_utils import data_handler
 from model_utils.data_handler import DataHandler
 from plotting import fig_tools
 
@@ -27,11 +29,12 @@ def plot_io_network(handler: DataHandler, labels=True):
     inflow = handler.fxe["FiE"]
     outflow = handler.fxe["FoE"]
     nodes = set(inflow.index) | set(inflow.columns) | set(outflow.index) | set(outflow.columns)
-    adjacency = pd.DataFrame(index=nodes, columns=nodes)
-    adjacency.update(inflow)
-    adjacency.update(outflow.T)
-    adjacency.fillna(0, inplace=True)
-    network = nx.from_pandas_adjacency(adjacency)
+    # Build the graph from the sparse (entity, flow) pairs directly: stack() keeps only
+    # the filled cells, so no dense nodes x nodes adjacency is ever materialized
+    network = nx.Graph()
+    network.add_nodes_from(nodes)
+    network.add_edges_from(inflow.stack().index)
+    network.add_edges_from(outflow.stack().index)
     nx.draw_networkx(network, node_size=100, font_size=6, with_labels=labels)
 
 
@@ -43,19 +46,16 @@ def plot_flow_fout(model, handler: DataHandler, flow_ids: list, unit: str = "TWh
 
     TODO: may not work properly for entities with multiple output efficiencies. Add a warning?
     """
-    entity_ids = sorted({e for f, e in model.FoE if f in flow_ids})
-    value_df = pd.DataFrame(index=model.Y, columns=entity_ids, data=0)
-
-    # Gather values
+    # Gather values per (flow, entity) with vectorized year lookups (no per-cell .loc assignments)
+    foe_index = data_handler.cache_flow_entity_index(model, "FoE")
+    years = list(model.Y)
+    values = {}  # type: dict[str, np.ndarray]
     for f in flow_ids:
-        for e in entity_ids:
-            for y in model.Y:
-                if e in model.Trades:
-                    activity = handler.get_annual(e, "actual_import", y)
-                else:
-                    activity = handler.get_annual(e, "actual_activity", y)
-                efficiency = handler.get_fxe(e, "output_efficiency", f, y)
-                value_df.loc[y, e] = activity * efficiency
+        for e in foe_index.get(f, ()):
+            activity = handler.get_annual_vec(e, "actual_import" if e in model.Trades else "actual_activity", years)
+            efficiency = handler.get_fxe_vec(e, "output_efficiency", f, years)
+            values[e] = values[e] + activity * efficiency if e in values else activity * efficiency
+    value_df = pd.DataFrame(values, index=years).sort_index(axis=1)
     # Plotting
     axis = value_df.plot.area(linewidth=0)
     title = f"Hist. estimate:fout:{flow_ids}"
@@ -69,19 +69,16 @@ def plot_flow_fin(model: ConcreteModel, handler: DataHandler, flow_ids: list, un
 
     TODO: may not work properly for entities with multiple input efficiencies. Add a warning?
     """
-    entity_ids = sorted({e for f, e in model.FiE if f in flow_ids})
-    value_df = pd.DataFrame(index=model.Y, columns=entity_ids, data=0)
-
-    # Gather values
+    # Gather values per (flow, entity) with vectorized year lookups (no per-cell .loc assignments)
+    fie_index = data_handler.cache_flow_entity_index(model, "FiE")
+    years = list(model.Y)
+    values = {}  # type: dict[str, np.ndarray]
     for f in flow_ids:
-        for e in entity_ids:
-            for y in model.Y:
-                if e in model.Trades:
-                    activity = handler.get_annual(e, "actual_export", y)
-                else:
-                    activity = handler.get_annual(e, "actual_activity", y)
-                efficiency = handler.get_fxe(e, "input_efficiency", f, y)
-                value_df.loc[y, e] = activity * efficiency
+        for e in fie_index.get(f, ()):
+            activity = handler.get_annual_vec(e, "actual_export" if e in model.Trades else "actual_activity", years)
+            efficiency = handler.get_fxe_vec(e, "input_efficiency", f, years)
+            values[e] = values[e] + activity * efficiency if e in values else activity * efficiency
+    value_df = pd.DataFrame(values, index=years).sort_index(axis=1)
     # Plotting
     axis = value_df.plot.area(linewidth=0)
     title = f"Hist. estimate:fout:{flow_ids}"
@@ -93,90 +90,52 @@ def plot_flow_fin(model: ConcreteModel, handler: DataHandler, flow_ids: list, un
 # --------------------------------------------------------------------------- #
 # Group plots
 # --------------------------------------------------------------------------- #
-def plot_group_param(model: ConcreteModel, handler: DataHandler, param: str, group_ids: list, unit: str):
-    """Plot the historical new capacity of the entities in a group."""
-    entity_ids = sorted({e for group in group_ids for e in model.E if group in e and e in model.Caps})
-    param_df = pd.DataFrame(index=model.Y, columns=entity_ids)
-
-    # Gather values
-    for e in entity_ids:
-        param_df[e] = {y: handler.get_annual(e, param, y) for y in model.Y}
+def plot_group_param(
+    model: ConcreteModel,
+    handler: DataHandler,
+    param: str,
+    group_ids: list,
+    unit: str,
+    label: str = "Tot Cap.",
+    caps_only: bool = True,
+    kind: str = "bar",
+):
+    """Plot a historical annual parameter for the entities in a group (shared by the plot_group_* helpers)."""
+    entity_ids = data_handler.cache_group_entities(model, group_ids, caps_only=caps_only)
+    years = list(model.Y)
+
+    # Gather values, column-wise
+    data = {e: handler.get_annual_vec(e, param, years) for e in entity_ids}
+    param_df = pd.DataFrame(data, index=years)
 
     # Plotting
-    axis = param_df.plot(kind="bar", stacked=True, width=0.8)
-    title = f"Modelled:Tot Cap.:{group_ids}"
+    if kind == "area":
+        axis = param_df.plot.area(linewidth=0)
+    else:
+        axis = param_df.plot(kind=kind, stacked=True, width=0.8)
+    title = f"Modelled:{label}:{group_ids}"
     fig_tools.prettify_plot(axis, title, unit)
 
     return axis
 
 
 def plot_group_ctot(model: ConcreteModel, handler: DataHandler, group_ids: list, unit="GW"):
-    """Plot the historical new capacity of the entities in a group."""
-    entity_ids = sorted({e for group in group_ids for e in model.E if group in e and e in model.Caps})
-    cap_df = pd.DataFrame(index=model.Y, columns=entity_ids)
-
-    # Gather values
-    for e in entity_ids:
-        for y in model.Y:
-            cap_df.loc[y, e] = handler.get_annual(e, "actual_capacity", y)
-
-    # Plotting
-    axis = cap_df.plot(kind="bar", stacked=True, width=0.8)
-    title = f"Modelled:Tot Cap.:{group_ids}"
-    fig_tools.prettify_plot(axis, title, unit)
-
-    return axis
+    """Plot the historical total capacity of the entities in a group."""
+    return plot_group_param(model, handler, "actual_capacity", group_ids, unit, label="Tot Cap.")
 
 
 def plot_group_cnew(model: ConcreteModel, handler: DataHandler, group_ids: list, unit="GW"):
     """Plot the historical new capacity of the entities in a group."""
-    entity_ids = sorted({e for group in group_ids for e in model.E if group in e and e in model.Caps})
-    cap_df = pd.DataFrame(index=model.Y, columns=entity_ids)
-
-    # Gather values
-    for e in entity_ids:
-        for y in model.Y:
-            cap_df.loc[y, e] = handler.get_annual(e, "actual_new_capacity", y)
-
-    # Plotting
-    axis = cap_df.plot(kind="bar", stacked=True, width=0.8)
-    title = f"Modelled:New Cap.:{group_ids}"
-    fig_tools.prettify_plot(axis, title, unit)
-
-    return axis
+    return plot_group_param(model, handler, "actual_new_capacity", group_ids, unit, label="New Cap.")
 
 
 def plot_group_cret(model: ConcreteModel, handler: DataHandler, group_ids: list, unit="GW"):
     """Plot the historical retired capacity of the entities in a group."""
-    entity_ids = sorted({e for group in group_ids for e in model.E if group in e and e in model.Caps})
-    cap_df = pd.DataFrame(index=model.Y, columns=entity_ids)
-
-    # Gather values
-    for e in entity_ids:
-        for y in model.Y:
-            cap_df.loc[y, e] = handler.get_annual(e, "actual_retired_capacity", y)
-
-    # Plotting
-    axis = cap_df.plot(kind="bar", stacked=True, width=0.8)
-    title = f"Modelled:Ret Cap.:{group_ids}"
-    fig_tools.prettify_plot(axis, title, unit)
-
-    return axis
+    return plot_group_param(model, handler, "actual_retired_capacity", group_ids, unit, label="Ret Cap.")
 
 
 def plot_group_act(model: ConcreteModel, handler: DataHandler, group_ids: list, unit="GW"):
     """Plot the activity of the entities in a group."""
-    entity_ids = sorted({e for group in group_ids for e in model.E if group in e})
-    act_df = pd.DataFrame(index=model.Y, columns=entity_ids)
-
-    # Gather values
-    for e in entity_ids:
-        for y in model.Y:
-            act_df.loc[y, e] = handler.get_annual(e, "actual_activity", y)
-
-    # Plotting
-    axis = act_df.plot.area(linewidth=0)
-    title = f"Modelled:Activity:{group_ids}"
-    fig_tools.prettify_plot(axis, title, unit)
-
-    return axis
+    return plot_group_param(
+        model, handler, "actual_activity", group_ids, unit, label="Activity", caps_only=False, kind="area"
+    )
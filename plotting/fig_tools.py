@@ -13,8 +13,19 @@ Stick to generic functionality, do not put result-specific stuff in here.
 """
 import matplotlib.pyplot as plt
 
-# Configure plot settings
-plt.rcParams["axes.prop_cycle"] = plt.cycler(color=plt.cm.tab20.colors)
+_configured = False
+
+
+def configure_defaults():
+    """Configure the default plot settings. Idempotent, so re-imports/reloads stay cheap."""
+    global _configured
+    if _configured:
+        return
+    plt.rcParams["axes.prop_cycle"] = plt.cycler(color=plt.cm.tab20.colors)
+    _configured = True
+
+
+configure_defaults()
 
 
 def inverted_legend(axis: plt.Axes, bbox_to_anchor=(1.05, 0.5)):
@@ -8,16 +8,31 @@
 # https://www.apache.org/licenses/LICENSE-2.0
 # --------------------------------------------------------------------------- #
 """Graph generating utilities for RESTORE model outputs."""
+import numpy as np
 import pandas as pd
 import pyomo.environ as pyo
 
+from model_utils import data_handler
 from model_utils.data_handler import DataHandler
 from plotting import fig_tools
 
 
+def _slice_year_map(model: pyo.ConcreteModel) -> dict:
+    """Map every year in YALL to the latest modelled year at or before it (time correction)."""
+    modelled = set(model.Y)
+    year_map = {}
+    current = model.Y.first()
+    for y_x in model.YALL:
+        if y_x in modelled:
+            current = y_x
+        year_map[y_x] = current
+    return year_map
+
+
 def _add_historical(axis, model: pyo.ConcreteModel, handler: DataHandler, flow: list):
-    historical_data = [handler.get_annual(flow, "actual_flow", y) for y in model.YALL]
-    historical_ref = pd.Series(data=historical_data, index=model.YALL, name="Historical total")
+    yall = list(model.YALL)
+    historical_data = handler.get_annual_vec(flow, "actual_flow", yall)
+    historical_ref = pd.Series(data=historical_data, index=yall, name="Historical total")
     axis = historical_ref.plot.line(ax=axis, color="black", linestyle="-.")
     return axis
 
@@ -27,18 +42,21 @@ def _add_historical(axis, model: pyo.ConcreteModel, handler: DataHandler, flow:
 # --------------------------------------------------------------------------- #
 def plot_flow_fout(model, handler: DataHandler, flow_ids: list, unit: str = "TWh", hist: str = None):
     """Plot the modelled entity out flows at a flow node."""
-    entity_ids = sorted({e for f, e in model.FoE if f in flow_ids})
-    value_df = pd.DataFrame(index=model.YALL, columns=entity_ids, data=0)
-
-    # Gather values
-    for f, e in model.FoE:
-        if f in flow_ids:
-            y = model.Y.first()
-            for y_x in model.YALL:
-                if y_x in model.Y:
-                    y = y_x
-                sum_fout = model.e_TotalAnnualOutflow[f, e, y]()
-                value_df.loc[y_x, e] += sum_fout  # time correction
+    foe_index = data_handler.cache_flow_entity_index(model, "FoE")
+    entity_ids = sorted(set(model._foe_e[np.isin(model._foe_f, list(flow_ids))]))
+    yall = list(model.YALL)
+    year_map = _slice_year_map(model)
+    col_pos = {e: i for i, e in enumerate(entity_ids)}
+    values = np.zeros((len(yall), len(entity_ids)))
+
+    # Gather values with positional writes (no per-cell .loc lookups)
+    expr = model.e_TotalAnnualOutflow
+    for f in flow_ids:
+        for e in foe_index.get(f, ()):
+            col = col_pos[e]
+            for i, y_x in enumerate(yall):
+                values[i, col] += expr[f, e, year_map[y_x]]()
+    value_df = pd.DataFrame(values, index=yall, columns=entity_ids)
     value_df = abs(value_df)  # Get rid of negative near-zero tolerances
     # Plotting
     axis = value_df.plot.area(linewidth=0)
@@ -52,18 +70,21 @@ def plot_flow_fout(model, handler: DataHandler, flow_ids: list, unit: str = "TWh
 
 def plot_flow_fin(model, handler: DataHandler, flow_ids: list, unit: str = "TWh", hist: str = None):
     """Plot the modelled entity in flows at a flow node."""
-    entity_ids = sorted({e for f, e in model.FiE if f in flow_ids})
-    value_df = pd.DataFrame(index=model.YALL, columns=entity_ids, data=0)
-
-    # Gather values
-    for f, e in model.FiE:
-        if f in flow_ids:
-            y = model.Y.first()
-            for y_x in model.YALL:
-                if y_x in model.Y:
-                    y = y_x
-                sum_fin = model.e_TotalAnnualInflow[f, e, y]()
-                value_df.loc[y_x, e] += sum_fin  # time correction
+    fie_index = data_handler.cache_flow_entity_index(model, "FiE")
+    entity_ids = sorted(set(model._fie_e[np.isin(model._fie_f, list(flow_ids))]))
+    yall = list(model.YALL)
+    year_map = _slice_year_map(model)
+    col_pos = {e: i for i, e in enumerate(entity_ids)}
+    values = np.zeros((len(yall), len(entity_ids)))
+
+    # Gather values with positional writes (no per-cell .loc lookups)
+    expr = model.e_TotalAnnualInflow
+    for f in flow_ids:
+        for e in fie_index.get(f, ()):
+            col = col_pos[e]
+            for i, y_x in enumerate(yall):
+                values[i, col] += expr[f, e, year_map[y_x]]()
+    value_df = pd.DataFrame(values, index=yall, columns=entity_ids)
     value_df = abs(value_df)  # Get rid of negative near-zero tolerances
     # Plotting
     axis = value_df.plot.area(linewidth=0)
@@ -78,69 +99,56 @@ def plot_flow_fin(model, handler: DataHandler, flow_ids: list, unit: str = "TWh"
 # --------------------------------------------------------------------------- #
 # Group plots
 # --------------------------------------------------------------------------- #
-def plot_group_ctot(model, group_ids: list, unit="GW"):
-    """Plot the modelled total capacity of the entities in a group."""
-    entity_ids = sorted({e for group in group_ids for e in model.E if group in e and e in model.Caps})
-    cap_df = pd.DataFrame(index=model.Y, columns=entity_ids)
+def _var_group_df(var, entity_ids: list, years: list) -> pd.DataFrame:
+    """Collect a Pyomo variable into a (years x entities) frame, built column-wise."""
+    data = {e: np.fromiter((var[e, y].value for y in years), np.float64, count=len(years)) for e in entity_ids}
+    return pd.DataFrame(data, index=years)
+
 
-    # Gather values
-    for e in entity_ids:
-        for y in model.Y:
-            cap_df.loc[y, e] = model.ctot[e, y].value
+def _plot_group_var(model, var, group_ids: list, label: str, unit: str):
+    """Plot a capacity-style variable for the entities in a group (shared by the plot_group_* helpers)."""
+    entity_ids = data_handler.cache_group_entities(model, group_ids)
+    cap_df = _var_group_df(var, entity_ids, list(model.Y))
 
     # Plotting
     axis = cap_df.plot(kind="bar", stacked=True, width=0.8)
-    title = f"Modelled:Tot Cap.:{group_ids}"
+    title = f"Modelled:{label}:{group_ids}"
     fig_tools.prettify_plot(axis, title, unit)
 
     return axis
 
 
-def plot_group_cnew(model, group_ids: list, unit="GW"):
-    """Plot the modelled new capacity of the entities in a group."""
-    entity_ids = sorted({e for group in group_ids for e in model.E if group in e and e in model.Caps})
-    cap_df = pd.DataFrame(index=model.Y, columns=entity_ids)
-
-    # Gather values
-    for e in entity_ids:
-        for y in model.Y:
-            cap_df.loc[y, e] = model.cnew[e, y].value
+def plot_group_ctot(model, group_ids: list, unit="GW"):
+    """Plot the modelled total capacity of the entities in a group."""
+    return _plot_group_var(model, model.ctot, group_ids, "Tot Cap.", unit)
 
-    # Plotting
-    axis = cap_df.plot(kind="bar", stacked=True, width=0.8)
-    title = f"Modelled:New Cap.:{group_ids}"
-    fig_tools.prettify_plot(axis, title, unit)
 
-    return axis
+def plot_group_cnew(model, group_ids: list, unit="GW"):
+    """Plot the modelled new capacity of the entities in a group."""
+    return _plot_group_var(model, model.cnew, group_ids, "New Cap.", unit)
 
 
 def plot_group_cret(model, group_ids: list, unit="GW"):
     """Plot the modelled retired capacity of the entities in a group."""
-    entity_ids = sorted({e for group in group_ids for e in model.E if group in e and e in model.Caps})
-    cap_df = pd.DataFrame(index=model.Y, columns=entity_ids)
-
-    # Gather values
-    for e in entity_ids:
-        for y in model.Y:
-            cap_df.loc[y, e] = model.cret[e, y].value
-
-    # Plotting
-    axis = cap_df.plot(kind="bar", stacked=True, width=0.8)
-    title = f"Modelled:New Cap.:{group_ids}"
-    fig_tools.prettify_plot(axis, title, unit)
-
-    return axis
+    return _plot_group_var(model, model.cret, group_ids, "Ret Cap.", unit)
 
 
 def plot_group_act(model, group_ids: list, unit="GW"):
     """Plot the activity of the entities in a group."""
-    entity_ids = sorted({e for group in group_ids for e in model.E if group in e})
-    act_df = pd.DataFrame(index=model.Y, columns=entity_ids)
-
-    # Gather values
-    for e in entity_ids:
-        for y in model.Y:
-            act_df.loc[y, e] = sum(model.DL[y, d]() * model.a[e, y, d, h].value for d in model.D for h in model.H)
+    entity_ids = data_handler.cache_group_entities(model, group_ids, caps_only=False)
+    years, days, hours = list(model.Y), list(model.D), list(model.H)
+    n_d, n_h = len(days), len(hours)
+
+    # Gather values: reduce the day/hour dimensions in NumPy instead of a nested Python sum
+    dl_vecs = {y: np.fromiter((model.DL[y, d]() for d in days), np.float64, count=n_d) for y in years}
+    values = np.zeros((len(years), len(entity_ids)))
+    for j, e in enumerate(entity_ids):
+        for i, y in enumerate(years):
+            a_mat = np.fromiter(
+                (model.a[e, y, d, h].value for d in days for h in hours), np.float64, count=n_d * n_h
+            ).reshape(n_d, n_h)
+            values[i, j] = a_mat.sum(axis=1) @ dl_vecs[y]
+    act_df = pd.DataFrame(values, index=years, columns=entity_ids)
 
     # Plotting
     axis = act_df.plot.area(linewidth=0)
@@ -152,8 +160,9 @@ def plot_group_act(model, group_ids: list, unit="GW"):
 
 def plot_act(model, entity_id, unit="GW"):
     """Plot the activity of a single entity."""
-    act = [model.e_TotalAnnualActivity[entity_id, y]() for y in model.Y]
-    act_df = pd.Series(index=model.Y, name=entity_id, data=act)
+    years = list(model.Y)
+    act = np.fromiter((model.e_TotalAnnualActivity[entity_id, y]() for y in years), np.float64, count=len(years))
+    act_df = pd.Series(index=years, name=entity_id, data=act)
 
     # Plotting
     axis = act_df.plot.area(linewidth=0)